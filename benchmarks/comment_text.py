@@ -0,0 +1,77 @@
+# comment_text.py - benchmark converting comment HTML to plaintext
+#
+# Compares clean_comment_body against the version it replaced, on vichan markup
+# samples and the comments of the fixture thread, and shows what memoizing
+# Post.text_comment saves when an exporter reads every comment several times.
+#
+# Usage: python benchmarks/comment_text.py [fixture.json]
+from __future__ import print_function
+import html
+import json
+import os
+import re
+import sys
+import timeit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..'))
+from py8chan.thread import Thread
+from py8chan.util import clean_comment_body, clean_comment_bodies
+from memory_per_post import FixtureBoard
+
+SAMPLES = {
+    'body-line paragraphs': '<p class="body-line ltr ">first line of text</p><p class="body-line ltr ">second &amp; third</p>'
+                            '<p class="body-line empty "></p><p class="body-line ltr ">last line</p>',
+    'quotelinks': '<p class="body-line ltr "><a onclick="highlightReply(\'12345\', event);" href="/tech/res/12000.html#12345">'
+                  '&gt;&gt;12345</a></p><p class="body-line ltr ">this</p><p class="body-line ltr ">'
+                  '<a href="/g/res/777.html#777">&gt;&gt;&gt;/g/777</a></p>',
+    'greentext and spoilers': '<p class="body-line ltr quote">&gt;implying</p><p class="body-line ltr ">'
+                              'it was <span class="spoiler">the butler</span> all along<br>really</p>',
+    'escaped brackets': '<p class="body-line ltr ">if a &lt; b and b &gt; c then &lt;3</p>',
+}
+
+
+def legacy_clean_comment_body(body):
+    body = html.unescape(body)
+    body = re.sub(r'<a [^>]+>(.+?)</a>', r'\1', body)
+    body = body.replace('<br>', '\n')
+    body = body.replace('<p class="body-line ltr ">', '\n')
+    body = re.sub(r'<.+?>', '', body)
+    body = body.strip()
+    return body
+
+
+def best(func, number):
+    return min(timeit.repeat(func, number=number, repeat=5)) / number
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(HERE, 'fixtures', 'thread_750.json')
+    with open(path) as f:
+        thread_json = json.load(f)
+    comments = [post.get('com', '') for post in thread_json['posts']]
+
+    for name, body in sorted(SAMPLES.items()):
+        assert clean_comment_body(body) == legacy_clean_comment_body(body), name
+        old = best(lambda: legacy_clean_comment_body(body), 2000)
+        new = best(lambda: clean_comment_body(body), 2000)
+        print('%-24s %7.2f us -> %7.2f us' % (name, old * 1e6, new * 1e6))
+
+    assert clean_comment_bodies(comments) == [legacy_clean_comment_body(c) for c in comments]
+    old = best(lambda: [legacy_clean_comment_body(c) for c in comments], 10)
+    new = best(lambda: clean_comment_bodies(comments), 10)
+    print('%-24s %7.2f ms -> %7.2f ms (%i comments)' % (os.path.basename(path), old * 1e3, new * 1e3, len(comments)))
+
+    def read_five_times(text):
+        thread = Thread._from_json(thread_json, FixtureBoard(), thread_json['posts'][0]['no'])
+        for _ in range(5):
+            for post in thread.posts:
+                text(post)
+
+    old = best(lambda: read_five_times(lambda post: legacy_clean_comment_body(post.html_comment)), 5)
+    new = best(lambda: read_five_times(lambda post: post.text_comment), 5)
+    print('%-24s %7.2f ms -> %7.2f ms' % ('text_comment read 5x', old * 1e3, new * 1e3))
+
+
+if __name__ == '__main__':
+    main()
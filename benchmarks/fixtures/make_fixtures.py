@@ -0,0 +1,173 @@
+# make_fixtures.py - regenerate the benchmark fixtures
+#
+# The fixtures follow the vichan/8kun API schema and markup, but their content is
+# generated from a fixed seed so that they are reproducible and safe to check in.
+#
+# Usage: python benchmarks/fixtures/make_fixtures.py
+from __future__ import print_function
+import base64
+import hashlib
+import json
+import os
+import random
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BOARD = 'tech'
+WORDS = ('the of and to in is you that it he was for on are as with his they at be this have from or '
+         'one had by word but not what all were we when your can said there use an each which she do how '
+         'their if will up other about out many then them these so some her would make like him into time '
+         'has look two more write go see number no way could people my than first water been call who oil '
+         'its now find long down day did get come made may part kernel linux thinkpad router firmware').split()
+
+
+def sentence(rng, low=3, high=18):
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(low, high)))
+
+
+def comment(rng, thread_id, previous):
+    """vichan comment markup: body-line paragraphs, quotelinks, greentext and spoilers."""
+    lines = []
+    for _ in range(rng.randint(1, 5)):
+        roll = rng.random()
+        if roll < 0.25 and previous:
+            target = rng.choice(previous[-40:])
+            lines.append('<p class="body-line ltr "><a onclick="highlightReply(\'%i\', event);" '
+                         'href="/%s/res/%i.html#%i">&gt;&gt;%i</a></p>' % (target, BOARD, thread_id, target, target))
+        elif roll < 0.35:
+            lines.append('<p class="body-line ltr quote">&gt;%s</p>' % sentence(rng))
+        elif roll < 0.42:
+            lines.append('<p class="body-line ltr ">%s <span class="spoiler">%s</span></p>' % (
+                sentence(rng), sentence(rng, 1, 4)))
+        elif roll < 0.45:
+            lines.append('<p class="body-line ltr "><a href="https://example.com/%s" rel="nofollow" '
+                         'target="_blank">https://example.com/%s</a></p>' % ((sentence(rng, 1, 2).replace(' ', '/'),) * 2))
+        elif roll < 0.48:
+            other = rng.randint(1000, 9999)
+            lines.append('<p class="body-line ltr "><a href="/g/res/%i.html#%i">&gt;&gt;&gt;/g/%i</a></p>' % (
+                other, other, other))
+        else:
+            lines.append('<p class="body-line ltr ">%s &amp; %s</p>' % (sentence(rng), sentence(rng)))
+        if rng.random() < 0.15:
+            lines.append('<p class="body-line empty "></p>')
+    return ''.join(lines)
+
+
+def file_fields(rng, new_style=True):
+    payload = str(rng.random()).encode()
+    ext = rng.choice(('.jpg', '.jpg', '.png', '.gif', '.webm', '.mp4'))
+    w, h = rng.randint(200, 4000), rng.randint(200, 4000)
+    scale = 255.0 / max(w, h)
+    return {
+        'tim': hashlib.sha256(payload).hexdigest() if new_style else str(rng.randint(10 ** 12, 10 ** 13)),
+        'filename': sentence(rng, 1, 3).replace(' ', '_'),
+        'ext': ext,
+        'fsize': rng.randint(20000, 8000000),
+        'md5': base64.b64encode(hashlib.md5(payload).digest()).decode('ascii'),
+        'w': w, 'h': h, 'tn_w': int(w * scale), 'tn_h': int(h * scale),
+        'fpath': 1 if new_style else 0,
+        'spoiler': 0,
+    }
+
+
+def post(rng, no, thread_id, time, previous, files):
+    data = {
+        'no': no,
+        'resto': 0 if no == thread_id else thread_id,
+        'com': comment(rng, thread_id, previous),
+        'name': 'Anonymous' if rng.random() < 0.9 else sentence(rng, 1, 1).title(),
+        'time': time,
+        'last_modified': time,
+        'id': '%06x' % rng.randint(0, 40),
+    }
+    if rng.random() < 0.05:
+        data['trip'] = '!%s' % hashlib.md5(str(no).encode()).hexdigest()[:10]
+    if files:
+        data.update(file_fields(rng))
+        if files > 1:
+            data['extra_files'] = [file_fields(rng) for _ in range(files - 1)]
+    return data
+
+
+def thread(seed, thread_id, replies, file_ratio, multi_ratio, start=1500000000):
+    rng = random.Random(seed)
+    posts, previous, time, no = [], [], start, thread_id
+    for i in range(replies + 1):
+        files = 0
+        if i == 0 or rng.random() < file_ratio:
+            files = rng.randint(2, 5) if rng.random() < multi_ratio else 1
+        data = post(rng, no, thread_id, time, previous, files)
+        if i == 0:
+            data.update({'sub': sentence(rng, 2, 8).capitalize(), 'sticky': 0, 'locked': 0,
+                         'cyclical': '0', 'bumplocked': '0', 'omitted_posts': 0, 'omitted_images': 0})
+        posts.append(data)
+        previous.append(no)
+        time += rng.randint(5, 600)
+        no += rng.randint(1, 3)
+    posts[0]['last_modified'] = posts[-1]['time']
+    return {'posts': posts}
+
+
+def catalog(seed, pages=25, threads_per_page=10, start=1500000000):
+    """catalog.json: every thread's OP with its last few replies, grouped by page."""
+    rng = random.Random(seed)
+    result, thread_id = [], 200000
+    for page in range(pages):
+        threads = []
+        for _ in range(threads_per_page):
+            replies = rng.randint(0, 750)
+            shown = thread(rng.random(), thread_id, min(replies, 5), file_ratio=0.3, multi_ratio=0.1,
+                           start=start + rng.randint(0, 10 ** 6))['posts']
+            op = shown[0]
+            op.update({'replies': replies, 'images': rng.randint(0, replies // 3 + 1),
+                       'omitted_posts': max(0, replies - 5), 'last_replies': shown[1:]})
+            threads.append(op)
+            thread_id += rng.randint(1000, 5000)
+        result.append({'page': page, 'threads': threads})
+    return result
+
+
+def boards(seed, count=4000):
+    """boards.json: metadata of every board, mostly small and idle, a few very active."""
+    rng = random.Random(seed)
+    locales = ('en', 'en', 'en', 'es', 'pt', 'de', 'fr', 'ja', 'ru', 'pl')
+    result, uris = [], set()
+    while len(result) < count:
+        uri = ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz0123456789') for _ in range(rng.randint(1, 8)))
+        if uri in uris:
+            continue
+        uris.add(uri)
+        activity = rng.paretovariate(1.2) - 1
+        result.append({
+            'uri': uri,
+            'title': sentence(rng, 1, 4).title(),
+            'subtitle': sentence(rng, 0, 8) if rng.random() < 0.6 else None,
+            'indexed': rng.random() < 0.8,
+            'sfw': rng.random() < 0.5,
+            'posts_total': int(activity * 5000),
+            'time': 1400000000 + rng.randint(0, 10 ** 8),
+            'weight': 0,
+            'locale': rng.choice(locales),
+            'tags': sorted(set(rng.choice(WORDS) for _ in range(rng.randint(0, 5)))),
+            'max': 250,
+            'active': int(activity * 3),
+            'pph': int(activity * 2),
+            'ppd': int(activity * 40),
+        })
+    return result
+
+
+def write(name, data):
+    with open(os.path.join(HERE, name), 'w') as f:
+        json.dump(data, f, separators=(',', ':'), sort_keys=True)
+    print('wrote', name)
+
+
+def main():
+    write('thread_750.json', thread(seed=750, thread_id=100000, replies=749, file_ratio=0.3, multi_ratio=0.1))
+    write('thread_multifile.json', thread(seed=5, thread_id=300000, replies=299, file_ratio=0.9, multi_ratio=0.6))
+    write('catalog.json', catalog(seed=25))
+    write('boards.json', boards(seed=4000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+# json_decoders.py - compare the JSON decoder backends on the fixture payloads
+#
+# Backends that aren't installed are skipped. Install orjson, msgspec or ujson
+# to include them.
+#
+# Usage: python benchmarks/json_decoders.py
+from __future__ import print_function
+import os
+import sys
+import timeit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..'))
+from py8chan.decoders import available_decoders, get_decoder
+
+FIXTURES = ('thread_750.json', 'catalog.json')
+
+
+def main():
+    backends = available_decoders()
+    print('Installed backends:', ', '.join(backends))
+
+    for fixture in FIXTURES:
+        with open(os.path.join(HERE, 'fixtures', fixture), 'rb') as f:
+            payload = f.read()
+
+        print('%s (%i bytes):' % (fixture, len(payload)))
+        expected = get_decoder('json')(payload)
+        for name in backends:
+            decode = get_decoder(name)
+            assert decode(payload) == expected, name
+            seconds = min(timeit.repeat(lambda: decode(payload), number=20, repeat=5)) / 20
+            print('  %-8s %8.2f ms  %7.1f MB/s' % (name, seconds * 1e3, len(payload) / seconds / 1e6))
+
+
+if __name__ == '__main__':
+    main()
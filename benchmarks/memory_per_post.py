@@ -0,0 +1,50 @@
+# memory_per_post.py - measure the memory held by Post and File objects of a fixture thread
+#
+# Only the objects py8chan builds on top of the API's post dicts are counted, since
+# the dicts themselves are loaded before measuring starts.
+#
+# Usage: python benchmarks/memory_per_post.py [fixture.json]
+from __future__ import print_function
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..'))
+from py8chan.thread import Thread
+from py8chan.url import Url
+
+
+class FixtureBoard(object):
+    """Just enough of a Board to build threads from JSON without any network access."""
+    name = 'tech'
+    https = _https = True
+
+    def __init__(self):
+        self._url = Url(self.name, self.https)
+        self._thread_cache = {}
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(HERE, 'fixtures', 'thread_750.json')
+    with open(path) as f:
+        thread_json = json.load(f)
+    board = FixtureBoard()
+
+    gc.collect()
+    tracemalloc.start()
+    thread = Thread._from_json(thread_json, board, thread_json['posts'][0]['no'])
+    posts = list(thread.posts)
+    files = list(thread.file_objects())
+    gc.collect()
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print('%s: %i posts, %i files' % (os.path.basename(path), len(posts), len(files)))
+    print('  %i bytes in total, %.0f bytes per post (including its files)' % (allocated, float(allocated) / len(posts)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,6 @@
+"""asv benchmark suite, run over the recorded payloads in ``benchmarks/fixtures``.
+
+Track results across commits with ``asv run``, compare two commits with
+``asv continuous master HEAD``, and try it against the working tree with
+``asv run --python=same --quick``. See ``asv.conf.json`` at the top of the repository.
+"""
@@ -0,0 +1,39 @@
+"""Parsing and querying a large boards.json."""
+import json
+
+from py8chan.board import _parse_boards
+from py8chan.directory import BoardDirectory
+
+from .common import load
+
+
+class Boards(object):
+    def setup(self):
+        self.raw = load('boards.json')
+        self.json = json.loads(self.raw)
+        self.boards = _parse_boards(self.json)
+        self.directory = BoardDirectory(ttl=None)
+        self.directory._load(self.boards)
+        self.directory._fetched = 0
+
+    def time_decode(self):
+        json.loads(self.raw)
+
+    def time_parse_boards(self):
+        _parse_boards(self.json)
+
+    def time_directory_load(self):
+        BoardDirectory(ttl=None)._load(self.boards)
+
+    def time_top_pph(self):
+        self.directory.top('pph', 50)
+
+    def time_top_pph_tagged(self):
+        self.directory.top('pph', 50, tag='linux', locale='en')
+
+    def time_between_ppd(self):
+        self.directory.between('ppd', 10, 1000)
+
+    def track_boards(self):
+        return len(self.directory)
+    track_boards.unit = 'boards'
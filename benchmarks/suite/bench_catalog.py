@@ -0,0 +1,30 @@
+"""Parsing a full catalog.json into catalog entries and threads."""
+import json
+
+from py8chan.catalog import iter_catalog_entries
+
+from .common import fixture_board, load
+
+
+class Catalog(object):
+    def setup(self):
+        self.raw = load('catalog.json')
+        self.json = json.loads(self.raw)
+        self.board = fixture_board()
+        self.url = self.board._url.catalog()
+
+    def time_decode(self):
+        json.loads(self.raw)
+
+    def time_catalog_entries(self):
+        list(iter_catalog_entries(self.json))
+
+    def time_catalog_threads(self):
+        # catalog pages are turned into threads in place, so start from a freshly decoded copy
+        self.board._thread_cache.clear()
+        self.board._threads_from_json(self.url, json.loads(self.raw))
+
+    def time_catalog_posts(self):
+        self.board._thread_cache.clear()
+        for thread in self.board._threads_from_json(self.url, json.loads(self.raw)):
+            list(thread.posts)
@@ -0,0 +1,106 @@
+"""Parsing a thread, building its objects and merging updates into it."""
+import json
+import tracemalloc
+
+from py8chan.thread import Thread
+from py8chan.util import clean_comment_body
+
+from .common import fixture_board, load
+
+THREAD_FIXTURES = ['thread_750.json', 'thread_multifile.json']
+
+
+class ThreadParse(object):
+    params = THREAD_FIXTURES
+    param_names = ['fixture']
+
+    def setup(self, fixture):
+        self.raw = load(fixture)
+        self.json = json.loads(self.raw)
+        self.id = self.json['posts'][0]['no']
+        self.board = fixture_board()
+        self.comments = [post.get('com', '') for post in self.json['posts']]
+
+    def _thread(self):
+        return Thread._from_json(self.json, self.board, self.id)
+
+    def time_decode(self, fixture):
+        json.loads(self.raw)
+
+    def time_from_json(self, fixture):
+        self._thread()
+
+    def time_posts(self, fixture):
+        # every Post, and the File of its first attachment
+        list(self._thread().posts)
+
+    def time_file_objects(self, fixture):
+        list(self._thread().file_objects())
+
+    def time_file_urls(self, fixture):
+        for item in self._thread().file_objects():
+            item.file_url
+            item.thumbnail_url
+
+    def time_text_comments(self, fixture):
+        self._thread().text_comments()
+
+    def time_clean_comment_body(self, fixture):
+        for comment in self.comments:
+            clean_comment_body(comment)
+
+    def time_reply_graph(self, fixture):
+        self._thread().reply_graph
+
+    def track_bytes_allocated(self, fixture):
+        # held by py8chan's objects once every post and file exists, the decoded JSON excepted
+        tracemalloc.start()
+        try:
+            thread = self._thread()
+            posts = list(thread.posts)
+            files = list(thread.file_objects())
+            return tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+    track_bytes_allocated.unit = 'bytes'
+
+    def peakmem_parse_and_build(self, fixture):
+        thread = Thread._from_json(json.loads(self.raw), self.board, self.id)
+        list(thread.posts)
+        list(thread.file_objects())
+
+
+class ThreadMerge(object):
+    """:meth:`py8chan.Thread._merge_posts`, the part of an update after the response is decoded."""
+    params = THREAD_FIXTURES
+    param_names = ['fixture']
+    new_replies = 50
+
+    def setup(self, fixture):
+        self.posts = json.loads(load(fixture))['posts']
+        self.id = self.posts[0]['no']
+        self.board = fixture_board()
+        self.older = {'posts': self.posts[:-self.new_replies]}
+        self.thread = Thread._from_json({'posts': self.posts}, self.board, self.id)
+        list(self.thread.posts)
+
+    def _older_thread(self):
+        return Thread._from_json(self.older, self.board, self.id)
+
+    def time_older_thread(self, fixture):
+        # baseline for time_merge_new_replies
+        self._older_thread()
+
+    def time_merge_new_replies(self, fixture):
+        self._older_thread()._merge_posts(self.posts)
+
+    def time_merge_new_replies_with_reply_graph(self, fixture):
+        thread = self._older_thread()
+        thread.reply_graph
+        thread._merge_posts(self.posts)
+
+    def time_merge_unchanged(self, fixture):
+        self.thread._merge_posts(self.posts)
+
+    def time_merge_forced(self, fixture):
+        self.thread._merge_posts(self.posts, force=True)
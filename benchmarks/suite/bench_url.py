@@ -0,0 +1,25 @@
+"""Building URLs of boards, threads and files."""
+from py8chan.url import Url
+
+POSTS = 1000
+
+
+class UrlGeneration(object):
+    def setup(self):
+        self.url = Url('tech', True)
+        self.posts = [{'no': i, 'tim': '%064x' % i, 'ext': '.png' if i % 3 else '.jpg'} for i in range(POSTS)]
+
+    def time_url_generator(self):
+        Url('tech', True)
+
+    def time_thread_urls(self):
+        url = self.url
+        for post in self.posts:
+            url.thread_url(post['no'])
+            url.thread_api_url(post['no'])
+
+    def time_file_urls(self):
+        url = self.url
+        for post in self.posts:
+            url.file_url(post['tim'], post['ext'])
+            url.thumb_url(post['tim'], post['ext'])
@@ -0,0 +1,27 @@
+"""Fixture loading shared by the benchmarks."""
+import json
+import os
+
+from py8chan.board import Board, _metadata
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'fixtures')
+BOARD = 'tech'
+
+
+def load(name):
+    """Returns the raw bytes of a fixture."""
+    with open(os.path.join(FIXTURES, name), 'rb') as f:
+        return f.read()
+
+
+def load_json(name):
+    return json.loads(load(name))
+
+
+def fixture_board():
+    """A :class:`py8chan.Board` for the fixtures' board, created without any network access."""
+    _metadata.setdefault(BOARD, {
+        'uri': BOARD, 'title': 'Technology', 'subtitle': None, 'indexed': True, 'sfw': True,
+        'weight': 0, 'locale': 'en', 'tags': ['technology'], 'max': 250, 'pph': 10, 'ppd': 240,
+    })
+    return Board(BOARD, https=True)
@@ -0,0 +1,76 @@
+# url_generator.py - compare a URL generator per Post and File against one shared per board
+#
+# Usage: python benchmarks/url_generator.py
+from __future__ import print_function
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from py8chan.url import Url
+
+POSTS = 1000
+
+
+class _NoCache(dict):
+    def __setitem__(self, key, value):
+        pass
+
+
+class PerObjectUrl(Url):
+    """Url as it used to be: site dictionaries rebuilt by every instance."""
+    _site_urls_cache = _NoCache()
+
+
+def make_posts(count):
+    return [{'no': i, 'tim': '%064x' % i, 'ext': '.png' if i % 3 else '.jpg'} for i in range(count)]
+
+
+def per_object(posts):
+    # old behaviour: every Post and every File built its own generator
+    urls = []
+    for post in posts:
+        post_url = PerObjectUrl('tech', True)
+        file_url = PerObjectUrl('tech', True)
+        urls.append((post_url, file_url,
+                     file_url.file_url(post['tim'], post['ext']),
+                     file_url.thumb_url(post['tim'], post['ext'])))
+    return urls
+
+
+def shared(posts):
+    # new behaviour: one generator per board, shared by reference
+    url = Url('tech', True)
+    return [(url, url, url.file_url(post['tim'], post['ext']), url.thumb_url(post['tim'], post['ext']))
+            for post in posts]
+
+
+def measure(func, posts):
+    seconds = min(timeit.repeat(lambda: func(posts), number=10, repeat=5)) / 10
+    tracemalloc.start()
+    result = func(posts)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return seconds, current
+
+
+def main():
+    posts = make_posts(POSTS)
+    assert [r[2:] for r in per_object(posts)] == [r[2:] for r in shared(posts)]
+
+    print('Per %i posts with one file each:' % POSTS)
+    results = {}
+    for name, func in (('per-object Url', per_object), ('shared Url', shared)):
+        seconds, allocated = measure(func, posts)
+        results[name] = seconds, allocated
+        print('  %-16s %8.2f ms  %10i bytes retained' % (name, seconds * 1000, allocated))
+
+    old, new = results['per-object Url'], results['shared Url']
+    print('  saved            %8.2f ms  %10i bytes (%.1fx faster)' % (
+        (old[0] - new[0]) * 1000, old[1] - new[1], old[0] / new[0]))
+
+
+if __name__ == '__main__':
+    main()
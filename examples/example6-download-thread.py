@@ -11,27 +11,6 @@ def mkdirs(path):
     if not os.path.exists(path):
         os.makedirs(path)
 
-def download_file(local_filename, url, clobber=False):
-    """Download the given file. Clobber overwrites file if exists."""
-    dir_name = os.path.dirname(local_filename)
-    mkdirs(dir_name)
-
-    if clobber or not os.path.exists(local_filename):
-        i = requests.get(url)
-
-        # if not exists
-        if i.status_code == 404:
-            print('Failed to download file:', local_filename, url)
-            return False
-
-        # write out in 1MB chunks
-        chunk_size_in_bytes = 1024*1024  # 1MB
-        with open(local_filename, 'wb') as local_file:
-            for chunk in i.iter_content(chunk_size=chunk_size_in_bytes):
-                local_file.write(chunk)
-
-    return True
-
 def download_json(local_filename, url, clobber=False):
     """Download the given JSON file, and pretty-print before we output it."""
     with open(local_filename, 'w') as json_file:
@@ -62,10 +41,15 @@ def main():
     print(url_builder.thread_api_url(thread_id))
     download_json(os.path.join(path, "%s.json" % thread_id), json_url)
 
-    # record the url of every file on the first thread, even extra files in posts
-    for img in thread.file_objects():
-        print("Downloading %s..." % img.file_url)
-        download_file(os.path.join(images_path, "%s" % img.filename), img.file_url)
+    # download every file on the thread, even extra files in posts, a few at a time
+    with py8chan.Downloader(max_workers=4) as downloader:
+        for result in downloader.iter_download(thread.file_objects(), images_path):
+            if result.skipped:
+                print("Already have %s" % result.file.file_url)
+            elif result.ok:
+                print("Downloaded %s (%.1f KB/s)" % (result.file.file_url, result.throughput / 1024))
+            else:
+                print("Failed to download file:", result.path, result.file.file_url, result.error)
 
 if __name__ == '__main__':
     main()
@@ -16,6 +16,21 @@ __version__ = '0.2.2'
 
 from .board import Board, board, get_boards, get_all_boards
 from .url import Url
+from .client import Client, get_default_client, set_default_client
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy, CircuitBreaker
+from .export import JSONLinesExporter, ParquetExporter, ArrowExporter
+from .archive import SQLiteArchive
 from .thread import Thread
 from .post import Post
 from .file import File
+from .replies import ReplyGraph
+from .frame import PostFrame
+from .aio import AsyncBoard, AsyncThread
+from .scheduler import ThreadScheduler
+from .cache import ThreadCache
+from .httpcache import HTTPCache
+from .catalog import CatalogEntry
+from .directory import BoardDirectory
+from .download import Downloader, DownloadResult
+from .media import MediaStore
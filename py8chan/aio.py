@@ -0,0 +1,350 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""asyncio interface to the 8chan API.
+
+:class:`AsyncBoard` and :class:`AsyncThread` mirror :class:`py8chan.Board` and
+:class:`py8chan.Thread`, but every network call is a coroutine running over a
+single pooled ``aiohttp`` session, so one event loop can keep many requests
+in flight at once. Parsing is shared with the blocking classes.
+
+Requires the optional ``aiohttp`` dependency (``pip install py8chan[async]``).
+"""
+import asyncio
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from . import __version__
+from .board import Board
+from .cache import ThreadCache
+from .decoders import get_decoder
+from .exceptions import PermanentError, TransientError, error_for_status
+from .retry import RetryPolicy
+from .thread import Thread
+from .url import Url
+
+
+class AsyncThread(Thread):
+    """A :class:`py8chan.Thread` whose network calls are coroutines.
+
+    AsyncThread objects are not instantiated directly, but through
+    :class:`py8chan.AsyncBoard` methods such as :meth:`AsyncBoard.get_thread`.
+    """
+    __slots__ = ()
+
+    async def update(self, force=False, raise_errors=False):
+        """Fetch new posts from the server.
+
+        See :meth:`py8chan.Thread.update`.
+
+        Arguments:
+            force (bool): Force a thread update, even if thread has 404'd.
+            raise_errors (bool): Raise the error of a failed update instead of returning 0.
+
+        Returns:
+            int: How many new posts have been fetched.
+        """
+
+        # The thread has already 404'ed, this function shouldn't do anything anymore.
+        if self.is_404 and not force:
+            return 0
+
+        policy = self._board._retry_policy
+        attempt = 0
+        while True:
+            try:
+                new_posts = await self._fetch_update(force)
+            except TransientError as e:
+                if attempt < policy.retries:
+                    await asyncio.sleep(policy.delay(attempt))
+                    attempt += 1
+                    continue
+                return self._failed(e, raise_errors)
+            except PermanentError as e:
+                return self._failed(e, raise_errors)
+            self._succeeded()
+            return new_posts
+
+    async def _fetch_update(self, force):
+        url = self._api_url
+        try:
+            status, body = await self._board._get(url, headers=self._update_headers())
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise TransientError('%s: %s' % (url, str(e) or type(e).__name__), url, cause=e)
+
+        # 304 Not Modified, no new posts.
+        if status == 304:
+            return 0
+
+        # 404 Not Found, thread died.
+        elif status == 404:
+            self._mark_404()
+            return 0
+
+        elif status == 200:
+            try:
+                posts = self._board._json_decoder(body)['posts']
+            except ValueError as e:
+                raise TransientError('%s: invalid JSON: %s' % (url, e), url, 200, e)
+            return self._merge_posts(posts, force)
+
+        else:
+            raise error_for_status(status, url)
+
+    async def expand(self):
+        """If there are omitted posts, update to include all posts."""
+        if self.omitted_posts > 0:
+            await self.update()
+
+    @property
+    def all_posts(self):
+        # expanding needs the event loop, so ``await thread.expand()`` first
+        return self.posts
+
+
+class AsyncBoard(object):
+    """Represents an 8chan board, accessed through asyncio.
+
+    Unlike :class:`py8chan.Board`, board metadata from ``boards.json`` is not
+    fetched on creation, so constructing an AsyncBoard never blocks.
+
+    Use it as an async context manager, or call :meth:`close` when done::
+
+        async with py8chan.AsyncBoard('tech') as board:
+            threads = await board.get_all_threads(expand=True)
+    """
+    _thread_class = AsyncThread
+
+    def __init__(self, board_name, https=False, session=None, connection_limit=100, cache=None,
+                 json_decoder='json', rate_limiter=None, retries=3, retry_policy=None, circuit_breaker=None):
+        """Creates a :class:`py8chan.AsyncBoard` object.
+
+        Args:
+            board_name (string): Name of the board, such as "tg" or "etc".
+            https (bool): Whether to use a secure connection to 8chan.
+            session: Existing aiohttp.ClientSession object to use instead of our own.
+            connection_limit (int): Maximum number of simultaneous connections
+                in our own session's pool.
+            cache (:class:`py8chan.ThreadCache`): Thread cache with eviction limits.
+                Threads are cached without limits by default.
+            json_decoder: JSON decoder for API responses, see :func:`py8chan.decoders.get_decoder`.
+            rate_limiter (:class:`py8chan.RateLimiter`): Paces every request, per host.
+                It can be shared with blocking boards through their :class:`py8chan.Client`.
+            retries (int): How many times to retry ``429`` and ``503`` responses
+                when rate limited, each after its ``Retry-After`` delay.
+            retry_policy (:class:`py8chan.RetryPolicy`): How :meth:`AsyncThread.update`
+                retries transient failures. Not retried by default.
+            circuit_breaker (:class:`py8chan.CircuitBreaker`): Stops sending requests
+                to a host after repeated connection errors and ``5xx`` responses.
+        """
+        if aiohttp is None:
+            raise ImportError('AsyncBoard requires aiohttp: pip install py8chan[async]')
+
+        self._board_name = board_name
+        self._https = https
+        self._protocol = 'https://' if https else 'http://'
+        self._url = Url(board=board_name, https=self._https)
+        self._json_decoder = get_decoder(json_decoder)
+
+        self._session = session
+        self._owns_session = session is None
+        self._connection_limit = connection_limit
+
+        self._thread_cache = cache if cache is not None else ThreadCache()
+        self._rate_limiter = rate_limiter
+        self._retries = retries
+        self._retry_policy = retry_policy or RetryPolicy()
+        self._circuit_breaker = circuit_breaker
+
+    def _get_session(self):
+        # aiohttp sessions must be created inside a running event loop
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self._connection_limit),
+                headers={'User-Agent': 'py-8chan/%s' % __version__},
+            )
+        return self._session
+
+    async def _get(self, url, headers=None, method='GET', raise_for_status=False):
+        breaker = self._circuit_breaker
+        if breaker is None:
+            return await self._get_paced(url, headers, method, raise_for_status)
+
+        breaker.allow(url)
+        try:
+            status, body = await self._get_paced(url, headers, method, raise_for_status)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            breaker.record_failure(url)
+            raise
+        except aiohttp.ClientResponseError as e:
+            if e.status >= 500:
+                breaker.record_failure(url)
+            else:
+                breaker.record_success(url)
+            raise
+        if status >= 500:
+            breaker.record_failure(url)
+        else:
+            breaker.record_success(url)
+        return status, body
+
+    async def _get_paced(self, url, headers, method, raise_for_status=False):
+        limiter = self._rate_limiter
+        attempt = 0
+        while True:
+            if limiter is not None:
+                await limiter.acquire_async(url)
+            async with self._get_session().request(method, url, headers=headers) as res:
+                body = await res.read()
+                throttled = limiter is not None and limiter.observe(url, res.status, res.headers)
+                if not throttled or attempt >= self._retries:
+                    if raise_for_status:
+                        res.raise_for_status()
+                    return res.status, body
+            attempt += 1
+
+    async def _get_json(self, url):
+        status, body = await self._get(url, raise_for_status=True)
+        return self._json_decoder(body)
+
+    async def get_thread(self, thread_id, update_if_cached=True, raise_404=False):
+        """Get a thread from 8chan via 8chan API.
+
+        Args:
+            thread_id (int): Thread ID
+            update_if_cached (bool): Whether the thread should be updated if it's already in our cache
+            raise_404 (bool): Raise an Exception if thread has 404'd
+
+        Returns:
+            :class:`py8chan.AsyncThread`: Thread object
+        """
+        # see if already cached
+        cached_thread = self._thread_cache.get(thread_id)
+        if cached_thread is not None:
+            if update_if_cached:
+                await cached_thread.update()
+            return cached_thread
+
+        status, body = await self._get(self._url.thread_api_url(thread_id=thread_id), raise_for_status=raise_404)
+        # check if thread exists
+        if status >= 400:
+            return None
+
+        thread_json = self._json_decoder(body)
+
+        thread = self._thread_class._from_json(thread_json, self, thread_id)
+        self._thread_cache[thread_id] = thread
+
+        return thread
+
+    async def thread_exists(self, thread_id):
+        """Check if a thread exists or has 404'd.
+
+        Args:
+            thread_id (int): Thread ID
+
+        Returns:
+            bool: Whether the given thread exists on this board.
+        """
+        status, _ = await self._get(self._url.thread_api_url(thread_id=thread_id), method='HEAD')
+        return status < 400
+
+    # catalog and page parsing is shared with the blocking Board
+    _catalog_to_threads = Board._catalog_to_threads
+    _threads_from_json = Board._threads_from_json
+    _threads_to_refresh = Board._threads_to_refresh
+
+    async def _request_threads(self, url):
+        return self._threads_from_json(url, await self._get_json(url))
+
+    async def get_threads(self, page=0):
+        """Returns all threads on a certain page.
+
+        See :meth:`py8chan.Board.get_threads`.
+
+        Args:
+            page (int): Page to request threads for. Defaults to the first page.
+
+        Returns:
+            list of :class:`py8chan.AsyncThread`: Threads on the given page.
+        """
+        return await self._request_threads(self._url.page_url(page))
+
+    async def get_all_thread_ids(self):
+        """Return the ID of every thread on this board.
+
+        Returns:
+            list of ints: List of IDs of every thread on this board.
+        """
+        json = await self._get_json(self._url.thread_list())
+        return [thread['no'] for page in json for thread in page['threads']]
+
+    async def get_all_threads(self, expand=False):
+        """Return every thread on this board.
+
+        See :meth:`py8chan.Board.get_all_threads`. When expanding, every thread
+        is requested at once; the session's connection pool bounds how many
+        requests are actually in flight.
+
+        Args:
+            expand (bool): Whether to download every single post of every thread.
+
+        Returns:
+            list of :class:`py8chan.AsyncThread`: Every thread on this board.
+        """
+        if not expand:
+            return await self._request_threads(self._url.catalog())
+
+        thread_ids = await self.get_all_thread_ids()
+        threads = await asyncio.gather(
+            *(self.get_thread(id, raise_404=False) for id in thread_ids)
+        )
+
+        return [thread for thread in threads if thread is not None]
+
+    async def refresh_cache(self, if_want_update=False, selective=False):
+        """Update all threads currently stored in our cache.
+
+        See :meth:`py8chan.Board.refresh_cache`.
+        """
+        threads = tuple(self._thread_cache.values())
+        if if_want_update:
+            threads = [thread for thread in threads if thread.want_update]
+
+        if selective:
+            threads = self._threads_to_refresh(threads, await self._get_json(self._url.thread_list()))
+
+        await asyncio.gather(*(thread.update() for thread in threads))
+
+    def clear_cache(self):
+        """Remove everything currently stored in our cache."""
+        self._thread_cache.clear()
+
+    async def close(self):
+        """Close the underlying HTTP session, if we created it."""
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    @property
+    def cache(self):
+        return self._thread_cache
+
+    @property
+    def name(self):
+        return self._board_name
+
+    @property
+    def https(self):
+        return self._https
+
+    def __repr__(self):
+        return '<AsyncBoard /%s/>' % self.name
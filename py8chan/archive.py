@@ -0,0 +1,335 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Incremental SQLite archive of boards and threads."""
+import json
+import sqlite3
+import threading
+import time
+
+from .export import iter_threads
+from .util import clean_comment_body
+
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS posts ('
+    ' board TEXT NOT NULL, thread INTEGER NOT NULL, no INTEGER NOT NULL,'
+    ' time INTEGER, last_modified INTEGER, poster_id TEXT, name TEXT, trip TEXT,'
+    ' sub TEXT, com TEXT, data TEXT NOT NULL, archived REAL,'
+    ' PRIMARY KEY (board, no))',
+    'CREATE INDEX IF NOT EXISTS posts_thread ON posts (board, thread, no)',
+    'CREATE INDEX IF NOT EXISTS posts_time ON posts (time)',
+    'CREATE INDEX IF NOT EXISTS posts_poster_id ON posts (poster_id)',
+
+    'CREATE TABLE IF NOT EXISTS files ('
+    ' board TEXT NOT NULL, no INTEGER NOT NULL, position INTEGER NOT NULL,'
+    ' md5 TEXT, tim TEXT, ext TEXT, filename TEXT, fsize INTEGER, w INTEGER, h INTEGER,'
+    ' PRIMARY KEY (board, no, position))',
+    'CREATE INDEX IF NOT EXISTS files_md5 ON files (md5)',
+
+    'CREATE TABLE IF NOT EXISTS threads ('
+    ' board TEXT NOT NULL, no INTEGER NOT NULL, posts INTEGER, last_modified INTEGER,'
+    ' is_404 INTEGER, archived REAL,'
+    ' PRIMARY KEY (board, no))',
+)
+
+# only rows whose data actually changed are rewritten
+_UPSERT_POST = (
+    'INSERT INTO posts (board, thread, no, time, last_modified, poster_id, name, trip, sub, com, data, archived)'
+    ' VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'
+    ' ON CONFLICT (board, no) DO UPDATE SET'
+    ' thread = excluded.thread, time = excluded.time, last_modified = excluded.last_modified,'
+    ' poster_id = excluded.poster_id, name = excluded.name, trip = excluded.trip, sub = excluded.sub,'
+    ' com = excluded.com, data = excluded.data, archived = excluded.archived'
+    ' WHERE posts.data IS NOT excluded.data'
+)
+_UPSERT_FILE = (
+    'INSERT INTO files (board, no, position, md5, tim, ext, filename, fsize, w, h)'
+    ' VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'
+    ' ON CONFLICT (board, no, position) DO UPDATE SET'
+    ' md5 = excluded.md5, tim = excluded.tim, ext = excluded.ext, filename = excluded.filename,'
+    ' fsize = excluded.fsize, w = excluded.w, h = excluded.h'
+    ' WHERE files.md5 IS NOT excluded.md5 OR files.tim IS NOT excluded.tim'
+)
+_FTS_SCHEMA = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5("
+    " comment, subject, name, filenames, tokenize = 'unicode61 remove_diacritics 2')"
+)
+# bm25 column weights: comment, subject, name, filenames
+_FTS_WEIGHTS = (1.0, 2.0, 0.5, 1.0)
+
+_UPSERT_THREAD = (
+    'INSERT INTO threads (board, no, posts, last_modified, is_404, archived) VALUES (?, ?, ?, ?, ?, ?)'
+    ' ON CONFLICT (board, no) DO UPDATE SET posts = excluded.posts,'
+    ' last_modified = excluded.last_modified, is_404 = excluded.is_404, archived = excluded.archived'
+)
+
+
+def _post_files(data):
+    files = []
+    if data.get('md5') or data.get('tim'):
+        files.append(data)
+    files.extend(data.get('extra_files') or ())
+    return files
+
+
+def _file_rows(board, data):
+    return [
+        (board, data['no'], position, item.get('md5'), None if item.get('tim') is None else str(item['tim']),
+         item.get('ext'), item.get('filename'), item.get('fsize'), item.get('w'), item.get('h'))
+        for position, item in enumerate(_post_files(data))
+    ]
+
+
+def _search_text(data):
+    filenames = ' '.join('%s%s' % (item.get('filename') or '', item.get('ext') or '') for item in _post_files(data))
+    return clean_comment_body(data.get('com', '')), data.get('sub'), data.get('name'), filenames
+
+
+class SearchHit(object):
+    """A post found by :meth:`py8chan.SQLiteArchive.search`.
+
+    Attributes:
+        board (string): Board the post is on.
+        thread (int): ID of the thread the post is in.
+        no (int): Post number.
+        time (int): When the post was made, as a UNIX timestamp.
+        score (float): BM25 relevance, lower is more relevant.
+        snippet (string): Part of the comment around the match, with matches in ``[brackets]``.
+    """
+    __slots__ = ('board', 'thread', 'no', 'time', 'score', 'snippet')
+
+    def __init__(self, board, thread, no, time, score, snippet):
+        self.board = board
+        self.thread = thread
+        self.no = no
+        self.time = time
+        self.score = score
+        self.snippet = snippet
+
+    def __repr__(self):
+        return '<SearchHit /%s/%i#%i %.2f>' % (self.board, self.thread, self.no, self.score)
+
+
+class SQLiteArchive(object):
+    """Mirrors boards and threads into a SQLite database.
+
+    Every thread is written in a single transaction of batched upserts, and
+    posts whose data hasn't changed since they were last archived aren't
+    rewritten. Threads whose post count and last modification time are
+    unchanged are skipped entirely. The database is in WAL mode, so other
+    connections can query it while a crawl is writing.
+
+    Posts are stored with their raw API dict as JSON in ``posts.data``, next
+    to indexed columns. Files, including extra files, are in ``files``, indexed
+    by MD5.
+
+    With ``full_text`` set, the plaintext comment, subject, name and file names
+    of every post are also kept in an FTS5 index, updated along with the posts,
+    for :meth:`search`.
+
+    Example::
+
+        with py8chan.SQLiteArchive('8chan.db', full_text=True) as archive:
+            archive.archive(py8chan.Board('tech'), max_workers=8)
+            print(archive.changes, 'posts added or changed')
+            for hit in archive.search('thinkpad NEAR(firmware)', board='tech'):
+                print(hit.board, hit.no, hit.snippet)
+
+    Attributes:
+        path (string): Path of the SQLite database.
+        full_text (bool): Whether posts are indexed for :meth:`search`.
+        changes (int): Posts added or changed since this object was created.
+    """
+    def __init__(self, path, full_text=False):
+        """Creates a :class:`py8chan.SQLiteArchive` object.
+
+        Args:
+            path (string): Path of the SQLite database, created if needed.
+            full_text (bool): Keep a full-text index of posts. Posts archived
+                before it was turned on are indexed by :meth:`index_missing`.
+        """
+        self.path = path
+        self.full_text = full_text
+        self.changes = 0
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        with self._db:
+            for statement in _SCHEMA:
+                self._db.execute(statement)
+            if full_text:
+                self._db.execute(_FTS_SCHEMA)
+
+    def archive(self, sources, max_workers=None, force=False):
+        """Archive every thread of the given boards and threads.
+
+        Boards are walked one thread at a time, see :func:`py8chan.export.iter_threads`.
+
+        Args:
+            sources: A :class:`py8chan.Board`, a :class:`py8chan.Thread`, or an iterable of them.
+            max_workers (int): How many threads of a board to fetch in parallel.
+            force (bool): Check every post, even in threads that look unchanged.
+
+        Returns:
+            int: How many posts were added or changed.
+        """
+        return sum(self.archive_thread(thread, force) for thread in iter_threads(sources, max_workers))
+
+    def archive_thread(self, thread, force=False):
+        """Archive one thread, in a single transaction.
+
+        Args:
+            thread (:class:`py8chan.Thread`): Thread to archive. Call
+                :meth:`py8chan.Thread.update` or ``expand`` first as needed.
+            force (bool): Check every post, even if the thread looks unchanged.
+
+        Returns:
+            int: How many posts were added or changed.
+        """
+        board = thread._board.name
+        raw_posts = thread.raw_posts
+        last_modified = max(data.get('last_modified') or data.get('time') or 0 for data in raw_posts)
+        now = time.time()
+
+        with self._lock:
+            if not force:
+                row = self._db.execute('SELECT posts, last_modified, is_404 FROM threads WHERE board = ? AND no = ?',
+                                       (board, thread.id)).fetchone()
+                if row == (len(raw_posts), last_modified, int(thread.is_404)):
+                    return 0
+
+            # compare with what we have, so only new and changed posts are written and indexed
+            stored = dict(self._db.execute('SELECT no, data FROM posts WHERE board = ? AND thread = ?',
+                                           (board, thread.id)))
+            post_rows, file_rows, changed = [], [], []
+            for data in raw_posts:
+                encoded = json.dumps(data, sort_keys=True, separators=(',', ':'))
+                if stored.get(data['no']) == encoded:
+                    continue
+                post_rows.append((
+                    board, thread.id, data['no'], data.get('time'), data.get('last_modified'), data.get('id'),
+                    data.get('name'), data.get('trip'), data.get('sub'), data.get('com'), encoded, now,
+                ))
+                file_rows.extend(_file_rows(board, data))
+                changed.append(data)
+
+            with self._db:
+                self._db.executemany(_UPSERT_POST, post_rows)
+                self._db.executemany(_UPSERT_FILE, file_rows)
+                if self.full_text:
+                    self._index_posts(board, thread.id, changed, stored)
+                self._db.execute(_UPSERT_THREAD, (board, thread.id, len(raw_posts), last_modified,
+                                                  int(thread.is_404), now))
+
+            self.changes += len(post_rows)
+            return len(post_rows)
+
+    def _index_posts(self, board, thread_id, posts, replaced):
+        rowids = dict(self._db.execute('SELECT no, rowid FROM posts WHERE board = ? AND thread = ?',
+                                       (board, thread_id)))
+        # new posts have nothing to remove from the index
+        self._db.executemany('DELETE FROM posts_fts WHERE rowid = ?',
+                             [(rowids[data['no']],) for data in posts if data['no'] in replaced])
+        self._db.executemany('INSERT INTO posts_fts (rowid, comment, subject, name, filenames)'
+                             ' VALUES (?, ?, ?, ?, ?)',
+                             [(rowids[data['no']],) + _search_text(data) for data in posts])
+
+    def index_missing(self, batch_size=10000):
+        """Add posts that aren't in the full-text index yet, such as those
+        archived before ``full_text`` was turned on.
+
+        Args:
+            batch_size (int): Posts indexed per transaction.
+
+        Returns:
+            int: How many posts were indexed.
+        """
+        if not self.full_text:
+            raise ValueError('full-text search is not enabled for this archive')
+        indexed = 0
+        while True:
+            with self._lock, self._db:
+                rows = self._db.execute(
+                    'SELECT rowid, data FROM posts WHERE rowid NOT IN (SELECT rowid FROM posts_fts)'
+                    ' ORDER BY rowid LIMIT ?', (batch_size,)).fetchall()
+                self._db.executemany('INSERT INTO posts_fts (rowid, comment, subject, name, filenames)'
+                                     ' VALUES (?, ?, ?, ?, ?)',
+                                     [(rowid,) + _search_text(json.loads(data)) for rowid, data in rows])
+            indexed += len(rows)
+            if len(rows) < batch_size:
+                return indexed
+
+    def search(self, query, board=None, thread=None, since=None, until=None, limit=20):
+        """Search archived posts, most relevant first.
+
+        Args:
+            query (string): FTS5 query, such as ``thinkpad``, ``"exact phrase"``,
+                ``linux AND NOT windows``, ``firm*`` or ``subject:rules``.
+            board (string): Only posts on this board.
+            thread (int): Only posts in this thread.
+            since (int): Only posts made at or after this UNIX timestamp.
+            until (int): Only posts made before this UNIX timestamp.
+            limit (int): Most results to return.
+
+        Returns:
+            list of :class:`py8chan.archive.SearchHit`: Matching posts.
+
+        Raises:
+            ValueError: Full-text search isn't enabled.
+            sqlite3.OperationalError: The query isn't valid FTS5 syntax.
+        """
+        if not self.full_text:
+            raise ValueError('full-text search is not enabled for this archive')
+
+        sql = ['SELECT p.board, p.thread, p.no, p.time, bm25(posts_fts, %s, %s, %s, %s) AS score,'
+               " snippet(posts_fts, 0, '[', ']', '...', 16)"
+               ' FROM posts_fts JOIN posts p ON p.rowid = posts_fts.rowid'
+               ' WHERE posts_fts MATCH ?' % _FTS_WEIGHTS]
+        args = [query]
+        for clause, value in (('p.board = ?', board), ('p.thread = ?', thread),
+                              ('p.time >= ?', since), ('p.time < ?', until)):
+            if value is not None:
+                sql.append(clause)
+                args.append(value)
+        args.append(limit)
+
+        with self._lock:
+            rows = self._db.execute(' AND '.join(sql) + ' ORDER BY score LIMIT ?', args).fetchall()
+        return [SearchHit(*row) for row in rows]
+
+    def thread_posts(self, board, thread_id):
+        """Returns the archived raw post dicts of a thread, in order.
+
+        Args:
+            board (string): Board name.
+            thread_id (int): Thread ID.
+        """
+        with self._lock:
+            rows = self._db.execute('SELECT data FROM posts WHERE board = ? AND thread = ? ORDER BY no',
+                                    (board, thread_id)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def posts_with_file(self, md5):
+        """Returns ``(board, post number)`` of every archived post with a file of this base64 MD5."""
+        with self._lock:
+            return self._db.execute('SELECT board, no FROM files WHERE md5 = ? ORDER BY board, no',
+                                    (md5,)).fetchall()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM posts').fetchone()[0]
+
+    def close(self):
+        """Closes the database."""
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self):
+        return '<SQLiteArchive %s>' % self.path
@@ -1,8 +1,18 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+
 import requests
 
 from . import __version__
+from .cache import ThreadCache
+from .catalog import iter_catalog_entries
+from .client import Client, get_default_client
+from .decoders import get_decoder
+from .frame import PostFrame
+from .httpcache import CachingAdapter
+from .retry import RetryPolicy
 from .thread import Thread
 from .url import Url
 
@@ -27,23 +37,27 @@ else:
     basestring = basestring
 
 
-def _fetch_boards_metadata(url_generator):
+def _fetch_boards_metadata(url_generator, client=None, json_decoder=None):
     if not _metadata:
-        resp = requests.get(url_generator.board_list())
+        resp = (client or get_default_client()).get(url_generator.board_list())
         resp.raise_for_status()
-        boards_list = resp.json()
-        assert(type(boards_list) is list)# This should be a list of board atribute dicts.
-        data = {}
-        for board in boards_list:
-            assert(type(board) is dict)# This should be a dict of board attributes.
-            uri = board['uri']
-            assert(type(uri) is unicode)# This should be text.
-            data[uri] = board
-        _metadata.update(data)
-
-
-def _get_board_metadata(url_generator, board, key):
-    _fetch_boards_metadata(url_generator)
+        boards_list = json_decoder(resp.content) if json_decoder else resp.json()
+        _metadata.update(_parse_boards(boards_list))
+
+
+def _parse_boards(boards_list):
+    assert(type(boards_list) is list)# This should be a list of board atribute dicts.
+    data = {}
+    for board in boards_list:
+        assert(type(board) is dict)# This should be a dict of board attributes.
+        uri = board['uri']
+        assert(type(uri) is unicode)# This should be text.
+        data[uri] = board
+    return data
+
+
+def _get_board_metadata(url_generator, board, key, client=None, json_decoder=None):
+    _fetch_boards_metadata(url_generator, client, json_decoder)
     return _metadata[board][key]
 
 
@@ -61,22 +75,56 @@ def get_boards(board_name_list, *args, **kwargs):
     return [Board(name, *args, **kwargs) for name in board_name_list]
 
 
+# arguments of Board after the board name, in order
+_BOARD_ARGS = ('https', 'session', 'cache', 'http_cache', 'json_decoder', 'client', 'retry_policy')
+
+
 def get_all_boards(*args, **kwargs):
     """Returns every board on 8chan.
 
     Returns:
         dict of :class:`basc_py8chan.Board`: All boards.
     """
+    # name positional Board arguments, so the session or client given is the one shared
+    kwargs.update(zip(_BOARD_ARGS, args))
+    args = ()
+
     # Use https based on how the Board class instances are to be instantiated
-    https = kwargs.get('https', args[1] if len(args) > 1 else False)
+    https = kwargs.get('https', False)
 
     # Dummy URL generator, only used to generate the board list which doesn't
     # require a valid board name
     url_generator = Url(None, https)
-    _fetch_boards_metadata(url_generator)
+
+    # every board shares one client, which fetches the board list too
+    client = _board_client(kwargs.get('session'), kwargs.get('client'), kwargs.get('http_cache'))
+    if kwargs.get('http_cache') is not None:
+        _mount_http_cache(client, url_generator, kwargs['http_cache'])
+    kwargs['client'] = client
+
+    _fetch_boards_metadata(url_generator, client, get_decoder(kwargs.get('json_decoder', 'json')))
     return get_boards(_metadata.keys(), *args, **kwargs)
 
 
+def _board_client(session, client, http_cache):
+    if client is not None:
+        return client
+    if session is not None:
+        return Client(session=session)
+    if http_cache is not None:
+        # the cache is mounted on the client, don't impose it on every other board
+        return get_default_client().copy()
+    return get_default_client()
+
+
+def _mount_http_cache(client, url_generator, http_cache):
+    # only API requests go through the cache, never file downloads
+    prefix = url_generator.URL['domain']['api'] + '/'
+    mounted = getattr(client.session, 'adapters', {}).get(prefix)
+    if not (isinstance(mounted, CachingAdapter) and mounted.cache is http_cache):
+        client.mount(prefix, client.adapter(CachingAdapter, http_cache))
+
+
 class Board(object):
     """Represents an 8chan board. See the following 8chan Swagger API Documentation for more details.
     https://gitlab.com/N3X15/8chan-API/blob/master/definitions/Board.json
@@ -89,23 +137,44 @@ class Board(object):
         page_count (int): How many pages this board has.
         threads_per_page (int): How many threads there are on each page.
     """
-    def __init__(self, board_name, https=False, session=None):
+    # class used to build threads fetched from this board
+    _thread_class = Thread
+
+    def __init__(self, board_name, https=False, session=None, cache=None, http_cache=None,
+                 json_decoder='json', client=None, retry_policy=None):
         """Creates a :mod:`basc_py8chan.Board` object.
 
         Args:
             board_name (string): Name of the board, such as "tg" or "etc".
             https (bool): Whether to use a secure connection to 8chan.
             session: Existing requests.session object to use instead of our current one.
+            cache (:class:`py8chan.ThreadCache`): Thread cache with eviction limits.
+                Threads are cached without limits by default.
+            http_cache (:class:`py8chan.HTTPCache`): On-disk cache for API responses,
+                which survives restarts. Mounted on the session for the API host.
+            json_decoder: JSON decoder for API responses: ``'json'``, ``'orjson'``,
+                ``'msgspec'``, ``'ujson'``, ``'auto'`` or a callable taking bytes.
+                See :func:`py8chan.decoders.get_decoder`.
+            client (:class:`py8chan.Client`): Client to send requests through.
+                Boards share the default client from :func:`py8chan.get_default_client`
+                unless a session or client is given. Boards with an ``http_cache``
+                get their own copy of it.
+            retry_policy (:class:`py8chan.RetryPolicy`): How :meth:`py8chan.Thread.update`
+                retries transient failures. Not retried by default.
         """
         self._board_name = board_name
         self._https = https
         self._protocol = 'https://' if https else 'http://'
         self._url = Url(board=board_name, https=self._https)
+        self._json_decoder = get_decoder(json_decoder)
 
-        self._requests_session = session or requests.session()
-        self._requests_session.headers['User-Agent'] = 'py-8chan/%s' % __version__
+        self._client = _board_client(session, client, http_cache)
+        self._requests_session = self._client.session
+        if http_cache is not None:
+            _mount_http_cache(self._client, self._url, http_cache)
 
-        self._thread_cache = {}
+        self._thread_cache = cache if cache is not None else ThreadCache()
+        self._retry_policy = retry_policy or RetryPolicy()
 
         # 8chan catalog information contained in API request
         self._uri = self._get_metadata('uri')
@@ -121,12 +190,13 @@ class Board(object):
         self._ppd = self._get_metadata('ppd')
 
     def _get_metadata(self, key):
-        return _get_board_metadata(url_generator=self._url, board=self._board_name, key=key)
+        return _get_board_metadata(url_generator=self._url, board=self._board_name, key=key,
+                                   client=self._client, json_decoder=self._json_decoder)
 
     def _get_json(self, url):
-        res = self._requests_session.get(url)
+        res = self._client.get(url)
         res.raise_for_status()
-        return res.json()
+        return self._json_decoder(res.content)
 
     def get_thread(self, thread_id, update_if_cached=True, raise_404=False):
         """Get a thread from 8chan via 8chan API.
@@ -141,12 +211,12 @@ class Board(object):
         """
         # see if already cached
         cached_thread = self._thread_cache.get(thread_id)
-        if cached_thread:
+        if cached_thread is not None:
             if update_if_cached:
                 cached_thread.update()
             return cached_thread
 
-        res = self._requests_session.get(
+        res = self._client.get(
             self._url.thread_api_url(
                 thread_id = thread_id
                 )
@@ -158,7 +228,7 @@ class Board(object):
         elif not res.ok:
             return None
 
-        thread = Thread._from_request(self, res, thread_id)
+        thread = self._thread_class._from_request(self, res, thread_id)
         self._thread_cache[thread_id] = thread
 
         return thread
@@ -172,7 +242,7 @@ class Board(object):
         Returns:
             bool: Whether the given thread exists on this board.
         """
-        return self._requests_session.head(
+        return self._client.head(
             self._url.thread_api_url(
                 thread_id=thread_id
                 )
@@ -189,8 +259,9 @@ class Board(object):
         return thread_list
 
     def _request_threads(self, url):
-        json = self._get_json(url)
+        return self._threads_from_json(url, self._get_json(url))
 
+    def _threads_from_json(self, url, json):
         if url == self._url.catalog():
             thread_list = self._catalog_to_threads(json)
         else:
@@ -199,11 +270,11 @@ class Board(object):
         threads = []
         for thread_json in thread_list:
             id = thread_json['posts'][0]['no']
-            if id in self._thread_cache:
-                thread = self._thread_cache[id]
+            thread = self._thread_cache.get(id)
+            if thread is not None:
                 thread.want_update = True
             else:
-                thread = Thread._from_json(thread_json, self)
+                thread = self._thread_class._from_json(thread_json, self)
                 self._thread_cache[thread.id] = thread
 
             threads.append(thread)
@@ -229,6 +300,18 @@ class Board(object):
         url = self._url.page_url(page)
         return self._request_threads(url)
 
+    def iter_catalog(self):
+        """Yield a lightweight summary of every thread in the board's catalog.
+
+        Unlike :meth:`get_all_threads`, no :class:`py8chan.Thread` or
+        :class:`py8chan.Post` is built and the thread cache is left untouched,
+        which makes this the cheap way to decide which threads to fetch.
+
+        Yields:
+            :class:`py8chan.CatalogEntry`: One entry per thread, in catalog order.
+        """
+        return iter_catalog_entries(self._get_json(self._url.catalog()))
+
     def get_all_thread_ids(self):
         """Return the ID of every thread on this board.
 
@@ -238,7 +321,7 @@ class Board(object):
         json = self._get_json(self._url.thread_list())
         return [thread['no'] for page in json for thread in page['threads']]
 
-    def get_all_threads(self, expand=False):
+    def get_all_threads(self, expand=False, max_workers=None):
         """Return every thread on this board.
 
         If not expanded, result is same as get_threads run across all board pages,
@@ -252,6 +335,10 @@ class Board(object):
         Args:
             expand (bool): Whether to download every single post of every thread.
                 If enabled, this option can be very slow and bandwidth-intensive.
+            max_workers (int): When expanding, how many threads to fetch in parallel
+                over our connection pool. Threads are fetched one after another by default.
+                Connections beyond the client's ``pool_maxsize`` aren't kept alive, so
+                give the board a :class:`py8chan.Client` with a pool at least this big.
 
         Returns:
             list of :mod:`basc_py8chan.Thread`: List of Thread objects representing every thread on this board.
@@ -260,22 +347,136 @@ class Board(object):
             return self._request_threads(self._url.catalog())
 
         thread_ids = self.get_all_thread_ids()
-        threads = [self.get_thread(id, raise_404=False) for id in thread_ids]
 
-        return filter(None, threads)
+        if max_workers and max_workers > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                # map() keeps the order of threads.json
+                threads = list(executor.map(self._fetch_thread, thread_ids))
+        else:
+            threads = [self._fetch_thread(id) for id in thread_ids]
+
+        return filter(lambda thread: thread is not None, threads)
+
+    def iter_all_threads(self, expand=False, max_workers=None):
+        """Yield every thread on this board.
+
+        Same as :meth:`get_all_threads`, except that when expanding in parallel,
+        each thread is yielded as soon as it has been fetched rather than in the
+        order of the thread listing. Threads that have 404'd are skipped. No more
+        than ``2 * max_workers`` threads are fetched ahead of the caller.
+
+        Args:
+            expand (bool): Whether to download every single post of every thread.
+            max_workers (int): When expanding, how many threads to fetch in parallel.
+
+        Yields:
+            :mod:`basc_py8chan.Thread`: Thread objects representing every thread on this board.
+        """
+        if not expand:
+            for thread in self._request_threads(self._url.catalog()):
+                yield thread
+            return
+
+        thread_ids = self.get_all_thread_ids()
+
+        if not max_workers or max_workers <= 1:
+            for thread in map(self._fetch_thread, thread_ids):
+                if thread is not None:
+                    yield thread
+            return
+
+        thread_ids = iter(thread_ids)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # at most two fetches per worker in flight, so a slow caller
+            # doesn't leave the rest of the board piling up in memory
+            pending = set(executor.submit(self._fetch_thread, id)
+                          for id in islice(thread_ids, 2 * max_workers))
+            try:
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for id in islice(thread_ids, len(done)):
+                        pending.add(executor.submit(self._fetch_thread, id))
+                    for future in done:
+                        thread = future.result()
+                        if thread is not None:
+                            yield thread
+            finally:
+                # don't keep fetching if the caller stops iterating early
+                for future in pending:
+                    future.cancel()
+
+    def to_frame(self, expand=False, max_workers=None):
+        """Return the posts of every thread on this board as a :class:`py8chan.PostFrame`.
+
+        Threads are fetched as with :meth:`iter_all_threads`. Only their columns
+        are kept, so threads that weren't in the cache already are dropped from
+        it once their posts have been read. Requires the optional ``numpy`` dependency.
+
+        Args:
+            expand (bool): Whether to download every single post of every thread,
+                rather than the last few replies the catalog includes.
+            max_workers (int): When expanding, how many threads to fetch in parallel.
+
+        Returns:
+            :class:`py8chan.PostFrame`: One row per post.
+        """
+        cached = set(self._thread_cache.keys())
+
+        def posts():
+            for thread in self.iter_all_threads(expand=expand, max_workers=max_workers):
+                for data in thread.raw_posts:
+                    yield data
+                if thread.id not in cached:
+                    self._thread_cache.pop(thread.id, None)
 
-    def refresh_cache(self, if_want_update=False):
-        """Update all threads currently stored in our cache."""
-        for thread in tuple(self._thread_cache.values()):
-            if if_want_update:
-                if not thread.want_update:
-                    continue
+        return PostFrame.from_posts(posts(), self.name)
+
+    def _fetch_thread(self, thread_id):
+        return self.get_thread(thread_id, raise_404=False)
+
+    def refresh_cache(self, if_want_update=False, selective=False):
+        """Update all threads currently stored in our cache.
+
+        Args:
+            if_want_update (bool): Only update threads with ``want_update`` set.
+            selective (bool): Fetch the flat thread listing at /{board}/threads.json
+                first, and only update threads whose ``last_modified`` has moved
+                since we last fetched them. Cached threads missing from the listing
+                are marked as 404'd without being fetched.
+        """
+        threads = tuple(self._thread_cache.values())
+        if if_want_update:
+            threads = [thread for thread in threads if thread.want_update]
+
+        if selective:
+            threads = self._threads_to_refresh(threads, self._get_json(self._url.thread_list()))
+
+        for thread in threads:
             thread.update()
 
+    def _threads_to_refresh(self, threads, thread_list_json):
+        last_modified = {thread['no']: thread.get('last_modified')
+                         for page in thread_list_json for thread in page['threads']}
+
+        changed = []
+        for thread in threads:
+            if thread.id not in last_modified:
+                # gone from the listing, so it has 404'd
+                thread._mark_404()
+            elif (thread.want_update or last_modified[thread.id] is None
+                    or last_modified[thread.id] != thread.topic.last_modified):
+                changed.append(thread)
+
+        return changed
+
     def clear_cache(self):
         """Remove everything currently stored in our cache."""
         self._thread_cache.clear()
 
+    @property
+    def cache(self):
+        return self._thread_cache
+
     @property
     def name(self):
         return self._board_name
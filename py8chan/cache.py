@@ -0,0 +1,216 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Bounded cache of :class:`py8chan.Thread` objects."""
+from collections import OrderedDict
+import threading
+import time
+import weakref
+
+# rough per-post overhead of a post dict and its Post object, in bytes
+_POST_OVERHEAD = 600
+
+
+def estimate_thread_size(thread):
+    """Returns a rough estimate of how many bytes a thread keeps in memory.
+
+    Based on the length of every value in the raw post dicts, plus a fixed
+    overhead per post. It is meant for comparing threads, not exact accounting.
+    """
+    size = 0
+    for data in thread.raw_posts:
+        size += _POST_OVERHEAD
+        for value in data.values():
+            if isinstance(value, list):
+                size += _POST_OVERHEAD * len(value)
+            else:
+                size += len(str(value))
+    return size
+
+
+class ThreadCache(object):
+    """Cache of threads by ID, as used by :class:`py8chan.Board`.
+
+    With no limits set it behaves like the plain dict it replaces. Otherwise,
+    the least recently used threads are evicted once there are more than
+    ``max_entries`` of them or their estimated size exceeds ``max_bytes``, and
+    threads that haven't been accessed for ``ttl`` seconds are dropped. Sizes
+    are estimated when a thread is stored and again each time it is updated.
+
+    Evicted threads are only held through a weak reference, so a thread the
+    caller still holds on to is found again, and put back in the cache, the
+    next time it is looked up.
+
+    Attributes:
+        max_entries (int): Most threads to keep, or None for no limit.
+        max_bytes (int): Most estimated bytes to keep, or None for no limit.
+        ttl (float): Seconds a thread may sit in the cache without being accessed, or None.
+        hits (int): Lookups that found a thread.
+        misses (int): Lookups that didn't.
+        evictions (int): Threads dropped to stay within the limits.
+    """
+    def __init__(self, max_entries=None, max_bytes=None, ttl=None):
+        """Creates a :class:`py8chan.ThreadCache` object.
+
+        Args:
+            max_entries (int): Most threads to keep.
+            max_bytes (int): Most estimated bytes to keep, see :func:`estimate_thread_size`.
+            ttl (float): Seconds a thread may sit in the cache without being accessed.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # thread id -> [thread, estimated size, last access], least recently used first
+        self._entries = OrderedDict()
+        self._evicted = weakref.WeakValueDictionary()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._clock = time.monotonic
+
+    def get(self, thread_id, default=None):
+        """Return the cached thread with this ID, or ``default``."""
+        with self._lock:
+            self._expire()
+            entry = self._entries.get(thread_id)
+            if entry is not None:
+                self.hits += 1
+                self._entries.move_to_end(thread_id)
+                entry[2] = self._clock()
+                return entry[0]
+
+            thread = self._evicted.pop(thread_id, None)
+            if thread is not None:
+                self.hits += 1
+                self._store(thread_id, thread)
+                return thread
+
+            self.misses += 1
+            return default
+
+    def __getitem__(self, thread_id):
+        thread = self.get(thread_id)
+        if thread is None:
+            raise KeyError(thread_id)
+        return thread
+
+    def __setitem__(self, thread_id, thread):
+        with self._lock:
+            self._expire()
+            self._store(thread_id, thread)
+
+    def __contains__(self, thread_id):
+        with self._lock:
+            return thread_id in self._entries or thread_id in self._evicted
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def pop(self, thread_id, default=None):
+        """Remove a thread from the cache and return it, or ``default``."""
+        with self._lock:
+            entry = self._entries.pop(thread_id, None)
+            if entry is not None:
+                self._bytes -= entry[1]
+                self._evicted.pop(thread_id, None)
+                return entry[0]
+            return self._evicted.pop(thread_id, default)
+
+    def resize(self, thread):
+        """Estimate a cached thread's size again after it changed.
+
+        Called by :meth:`py8chan.Thread.update` whenever it merges new posts,
+        so lookups don't have to.
+
+        Args:
+            thread (:class:`py8chan.Thread`): Thread that changed.
+        """
+        if self.max_bytes is None:
+            return
+        with self._lock:
+            entry = self._entries.get(thread.id)
+            if entry is not None and entry[0] is thread:
+                self._resize(entry, estimate_thread_size(thread))
+                self._evict()
+
+    def keys(self):
+        """list: IDs of every cached thread."""
+        with self._lock:
+            return list(self._entries)
+
+    def values(self):
+        """list of :class:`py8chan.Thread`: Every cached thread."""
+        with self._lock:
+            return [entry[0] for entry in self._entries.values()]
+
+    def clear(self):
+        """Remove everything from the cache. Counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._evicted.clear()
+            self._bytes = 0
+
+    @property
+    def size(self):
+        """int: Estimated bytes held by cached threads."""
+        return self._bytes
+
+    def stats(self):
+        """Returns the cache counters.
+
+        Returns:
+            dict: ``entries``, ``bytes``, ``hits``, ``misses`` and ``evictions``.
+        """
+        return {
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+    def _store(self, thread_id, thread):
+        entry = self._entries.pop(thread_id, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+        self._evicted.pop(thread_id, None)
+
+        size = estimate_thread_size(thread) if self.max_bytes is not None else 0
+        self._entries[thread_id] = [thread, size, self._clock()]
+        self._bytes += size
+        self._evict()
+
+    def _resize(self, entry, size):
+        self._bytes += size - entry[1]
+        entry[1] = size
+
+    def _evict(self):
+        # always keep the most recently used thread, even if it's too large on its own
+        while len(self._entries) > 1 and (
+                (self.max_entries is not None and len(self._entries) > self.max_entries) or
+                (self.max_bytes is not None and self._bytes > self.max_bytes)):
+            self._drop_oldest()
+
+    def _expire(self):
+        # entries are in access order, so expired ones are at the front
+        if self.ttl is None:
+            return
+        deadline = self._clock() - self.ttl
+        while self._entries and next(iter(self._entries.values()))[2] < deadline:
+            self._drop_oldest()
+
+    def _drop_oldest(self):
+        thread_id, (thread, size, _) = self._entries.popitem(last=False)
+        self._bytes -= size
+        self._evicted[thread_id] = thread
+        self.evictions += 1
+
+    def __repr__(self):
+        return '<ThreadCache %i threads, %i hits, %i misses, %i evictions>' % (
+            len(self._entries), self.hits, self.misses, self.evictions
+        )
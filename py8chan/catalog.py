@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Lightweight entries of a board's catalog."""
+
+
+class CatalogEntry(object):
+    """Summary of one thread from a board's catalog.
+
+    CatalogEntry objects are yielded by :meth:`py8chan.Board.iter_catalog`. They
+    only copy the few fields needed to decide which threads to fetch, and keep
+    no reference to the catalog JSON or to any :class:`py8chan.Post`.
+
+    Attributes:
+        id (int): Thread ID, the post number of its OP.
+        page (int): Board page the thread is on, starting from 0.
+        last_modified (int): Unix timestamp of the last change to the thread.
+        num_replies (int): Number of replies in the thread.
+        num_images (int): Number of images in the thread's replies.
+        subject (string): Subject of the OP, or None.
+        has_file (bool): Whether the OP has a file attached.
+        sticky (bool): Whether this thread is a 'sticky'.
+        locked (bool): Whether this thread is locked.
+    """
+    __slots__ = ('id', 'page', 'last_modified', 'num_replies', 'num_images',
+                 'subject', 'has_file', 'sticky', 'locked')
+
+    def __init__(self, data, page):
+        self.id = data['no']
+        self.page = page
+        self.last_modified = data.get('last_modified')
+        self.num_replies = data.get('replies', 0)
+        self.num_images = data.get('images', 0)
+        self.subject = data.get('sub')
+        self.has_file = 'filename' in data
+        self.sticky = data.get('sticky') == 1
+        self.locked = data.get('locked') == 1
+
+    # allows id to exist as multiple different names
+    @property
+    def number(self):
+        return self.id
+    num = no = number
+
+    def __repr__(self):
+        return '<CatalogEntry %i, page %s, replies %i>' % (self.id, self.page, self.num_replies)
+
+
+def iter_catalog_entries(catalog_json):
+    """Yields a :class:`CatalogEntry` for every thread of a parsed catalog.json."""
+    for page in catalog_json:
+        page_number = page.get('page')
+        for thread in page['threads']:
+            yield CatalogEntry(thread, page_number)
@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Shared HTTP client for blocking requests."""
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from . import __version__
+
+
+class Client(object):
+    """A pooled ``requests`` session with default timeouts and retries.
+
+    Every :class:`py8chan.Board` created without its own session or client
+    uses the process-wide default client from :func:`get_default_client`, as
+    do their threads and files, so a crawl across many boards keeps reusing a
+    handful of warm keep-alive connections to the API and media hosts.
+
+    Example::
+
+        py8chan.set_default_client(py8chan.Client(pool_maxsize=32, timeout=10, retries=5))
+        boards = py8chan.get_all_boards()
+
+    Attributes:
+        session: The underlying requests.session object.
+        timeout (float): Seconds to wait for the server when a request doesn't
+            set its own timeout, or None to wait forever.
+    """
+    def __init__(self, pool_connections=10, pool_maxsize=10, pool_block=False, timeout=30, retries=3,
+                 backoff_factor=0.5, session=None, rate_limiter=None, circuit_breaker=None):
+        """Creates a :class:`py8chan.Client` object.
+
+        Args:
+            pool_connections (int): How many hosts to keep connection pools for.
+            pool_maxsize (int): Most connections to keep alive per host.
+            pool_block (bool): Wait for a free connection when the pool is exhausted,
+                instead of opening one that is discarded afterwards.
+            timeout (float): Default seconds to wait for the server, or None to wait forever.
+            retries (int): How many times to retry failed connections and
+                ``500``, ``502``, ``503`` and ``504`` responses to GET and HEAD requests.
+            backoff_factor (float): Retries wait ``backoff_factor * 2 ** (retry - 1)`` seconds.
+            session: Existing requests.session object to use as is, instead of our own.
+            rate_limiter (:class:`py8chan.RateLimiter`): Paces every request, per host.
+                ``429`` and ``503`` responses then slow the limiter down and are
+                retried after their ``Retry-After`` delay.
+            circuit_breaker (:class:`py8chan.CircuitBreaker`): Stops sending requests
+                to a host after repeated connection errors and ``5xx`` responses.
+        """
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.circuit_breaker = circuit_breaker
+        self._settings = dict(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                              pool_block=pool_block, timeout=timeout, retries=retries,
+                              backoff_factor=backoff_factor, rate_limiter=rate_limiter,
+                              circuit_breaker=circuit_breaker)
+
+        if session is None:
+            session = requests.session()
+            adapter = self.adapter()
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        session.headers['User-Agent'] = 'py-8chan/%s' % __version__
+        self.session = session
+
+    def adapter(self, adapter_class=HTTPAdapter, *args, **kwargs):
+        """Returns a new transport adapter with this client's pool and retry settings.
+
+        Args:
+            adapter_class: :class:`requests.adapters.HTTPAdapter` subclass to create.
+            *args, **kwargs: Passed on to the adapter.
+        """
+        settings = self._settings
+        kwargs.setdefault('pool_connections', settings['pool_connections'])
+        kwargs.setdefault('pool_maxsize', settings['pool_maxsize'])
+        kwargs.setdefault('pool_block', settings['pool_block'])
+        kwargs.setdefault('max_retries', Retry(
+            total=settings['retries'],
+            backoff_factor=settings['backoff_factor'],
+            # with a rate limiter, throttling responses are retried by us, so it sees them
+            status_forcelist=(500, 502, 504) if self.rate_limiter else (500, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            raise_on_status=False,
+        ))
+        return adapter_class(*args, **kwargs)
+
+    @property
+    def pool_maxsize(self):
+        """int: Most connections kept alive per host, as set when the client was created."""
+        return self._settings['pool_maxsize']
+
+    def copy(self, **settings):
+        """Returns a new client with the same settings, but its own connection pools.
+
+        Connection pools are sized once, when a client is created; copy a
+        shared client to get a bigger pool rather than resizing its own.
+
+        Args:
+            **settings: Arguments of :meth:`__init__` to change, such as ``pool_maxsize``.
+        """
+        kwargs = dict(self._settings)
+        kwargs.update(settings)
+        return Client(**kwargs)
+
+    def mount(self, prefix, adapter):
+        """Use a transport adapter for every URL starting with ``prefix``."""
+        self.session.mount(prefix, adapter)
+
+    def get(self, url, **kwargs):
+        """Sends a GET request, with the default timeout unless one is given."""
+        return self._send(self.session.get, url, kwargs)
+
+    def head(self, url, **kwargs):
+        """Sends a HEAD request, with the default timeout unless one is given."""
+        return self._send(self.session.head, url, kwargs)
+
+    def _send(self, method, url, kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        breaker = self.circuit_breaker
+        if breaker is None:
+            return self._send_paced(method, url, kwargs)
+
+        breaker.allow(url)
+        try:
+            res = self._send_paced(method, url, kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            breaker.record_failure(url)
+            raise
+        if res.status_code >= 500:
+            breaker.record_failure(url)
+        else:
+            breaker.record_success(url)
+        return res
+
+    def _send_paced(self, method, url, kwargs):
+        limiter = self.rate_limiter
+        if limiter is None:
+            return method(url, **kwargs)
+
+        attempt = 0
+        while True:
+            limiter.acquire(url)
+            res = method(url, **kwargs)
+            if not limiter.observe(url, res.status_code, res.headers) or attempt >= self._settings['retries']:
+                return res
+            # the limiter now holds the next attempt back for Retry-After
+            res.close()
+            attempt += 1
+
+    def close(self):
+        """Close every pooled connection."""
+        self.session.close()
+
+    def __repr__(self):
+        return '<Client %i connections per host, timeout %s>' % (self._settings['pool_maxsize'], self.timeout)
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client():
+    """Returns the process-wide :class:`py8chan.Client`, creating it on first use."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = Client()
+        return _default_client
+
+
+def set_default_client(client):
+    """Replace the process-wide :class:`py8chan.Client`.
+
+    Only boards created afterwards use the new client.
+    """
+    global _default_client
+    with _default_client_lock:
+        _default_client = client
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""JSON decoder backends for API responses.
+
+Every decoder takes the raw response body as bytes, so faster backends can
+parse it without first building an intermediate text string, and raises
+:class:`ValueError` on invalid JSON whatever the backend.
+"""
+import json
+
+# backends tried by 'auto', fastest first
+_AUTO_ORDER = ('orjson', 'msgspec', 'ujson', 'json')
+
+
+def _load_backend(name):
+    if name == 'json':
+        return json.loads
+    if name == 'orjson':
+        import orjson
+        return orjson.loads
+    if name == 'msgspec':
+        import msgspec
+        return _msgspec_decoder(msgspec.json.decode, msgspec.DecodeError)
+    if name == 'ujson':
+        import ujson
+        return ujson.loads
+    raise ValueError('unknown JSON decoder %r, expected one of %s' % (name, ', '.join(_AUTO_ORDER + ('auto',))))
+
+
+def _msgspec_decoder(decode, error):
+    # msgspec.DecodeError isn't a ValueError, unlike the errors of every other backend
+    def msgspec_decode(body):
+        try:
+            return decode(body)
+        except error as e:
+            raise ValueError(str(e))
+    return msgspec_decode
+
+
+def available_decoders():
+    """Returns the names of the JSON decoder backends that are installed."""
+    names = []
+    for name in _AUTO_ORDER:
+        try:
+            _load_backend(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def get_decoder(decoder='json'):
+    """Returns a function decoding JSON from bytes.
+
+    Args:
+        decoder: Name of a backend, ``'json'`` (the standard library), ``'orjson'``,
+            ``'msgspec'`` or ``'ujson'``, or ``'auto'`` for the fastest one installed.
+            A callable taking bytes is returned as is.
+
+    Raises:
+        ImportError: The requested backend isn't installed.
+        ValueError: The requested backend is unknown.
+    """
+    if callable(decoder):
+        return decoder
+    if decoder == 'auto':
+        decoder = available_decoders()[0]
+    return _load_backend(decoder)
@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Searchable directory of every board, from ``boards.json``."""
+from bisect import bisect_left, bisect_right
+import threading
+import time
+
+from .board import Board, _metadata, _parse_boards
+from .client import get_default_client
+from .decoders import get_decoder
+from .url import Url
+
+# board metadata fields kept in sorted indexes
+SORTED_KEYS = ('pph', 'ppd', 'active', 'posts_total')
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class _SortedIndex(object):
+    # board URIs ordered by one numeric field, ascending
+    __slots__ = ('values', 'uris')
+
+    def __init__(self, boards, key):
+        pairs = sorted((_number(data.get(key)), uri) for uri, data in boards.items())
+        self.values = [value for value, _ in pairs]
+        self.uris = [uri for _, uri in pairs]
+
+
+class BoardDirectory(object):
+    """Every board listed in ``boards.json``, indexed for picking boards by activity.
+
+    The board list is fetched on first use and again once it is older than
+    ``ttl`` seconds. Boards are kept in sorted indexes on ``pph``, ``ppd``,
+    ``active`` and ``posts_total``, and in inverted indexes on their tags and
+    locale, so queries don't have to scan every board. :class:`py8chan.Board`
+    objects are only created when asked for, and then reused.
+
+    Example::
+
+        directory = py8chan.BoardDirectory(ttl=600)
+        for board in directory.boards(directory.top('pph', 10, tag='technology')):
+            print(board.name, board.title)
+
+    Attributes:
+        ttl (float): Seconds before the board list is fetched again, or None to never refresh it.
+        https (bool): Whether boards are accessed over a secure connection.
+    """
+    def __init__(self, ttl=3600, https=False, client=None, json_decoder='json', **board_kwargs):
+        """Creates a :class:`py8chan.BoardDirectory` object.
+
+        Args:
+            ttl (float): Seconds before the board list is fetched again.
+            https (bool): Whether to use a secure connection to 8chan.
+            client (:class:`py8chan.Client`): Client to send requests through.
+                Defaults to :func:`py8chan.get_default_client`.
+            json_decoder: JSON decoder for API responses, see :func:`py8chan.decoders.get_decoder`.
+            **board_kwargs: Passed on to every :class:`py8chan.Board` handed out.
+        """
+        self.ttl = ttl
+        self.https = https
+        self._client = client
+        self._json_decoder = get_decoder(json_decoder)
+        self._url = Url(None, https)
+        self._board_kwargs = dict(board_kwargs, https=https, json_decoder=json_decoder)
+        if client is not None:
+            self._board_kwargs['client'] = client
+
+        self._lock = threading.RLock()
+        self._clock = time.monotonic
+        self._fetched = None
+        self._boards = {}
+        self._sorted = {}
+        self._tags = {}
+        self._locales = {}
+        self._instances = {}
+
+    def refresh(self, force=False):
+        """Fetch ``boards.json`` again if the copy we have is older than ``ttl``.
+
+        Args:
+            force (bool): Fetch it even if it hasn't expired yet.
+
+        Returns:
+            bool: Whether the board list was fetched.
+        """
+        with self._lock:
+            if not force and self._fetched is not None and (
+                    self.ttl is None or self._clock() - self._fetched < self.ttl):
+                return False
+
+            res = (self._client or get_default_client()).get(self._url.board_list())
+            res.raise_for_status()
+            self._load(_parse_boards(self._json_decoder(res.content)))
+            self._fetched = self._clock()
+            return True
+
+    def _load(self, boards):
+        self._boards = boards
+        self._sorted = dict((key, _SortedIndex(boards, key)) for key in SORTED_KEYS)
+
+        tags, locales = {}, {}
+        for uri, data in boards.items():
+            for tag in data.get('tags') or ():
+                tags.setdefault(tag.lower(), set()).add(uri)
+            if data.get('locale'):
+                locales.setdefault(data['locale'].lower(), set()).add(uri)
+        self._tags = tags
+        self._locales = locales
+
+        # boards that are gone from the listing lose their cached Board too
+        for uri in list(self._instances):
+            if uri not in boards:
+                del self._instances[uri]
+
+        # keep Board's own metadata lookups in step with the directory
+        for uri in list(_metadata):
+            if uri not in boards:
+                del _metadata[uri]
+        _metadata.update(boards)
+
+    def _current(self):
+        self.refresh()
+        return self._boards
+
+    def __len__(self):
+        return len(self._current())
+
+    def __contains__(self, uri):
+        return uri in self._current()
+
+    def __iter__(self):
+        return iter(sorted(self._current()))
+
+    def metadata(self, uri):
+        """Returns the raw ``boards.json`` entry of a board.
+
+        Raises:
+            KeyError: No board has that URI.
+        """
+        return self._current()[uri]
+
+    def board(self, uri):
+        """Returns the :class:`py8chan.Board` for a URI, creating it on first use.
+
+        Raises:
+            KeyError: No board has that URI.
+        """
+        with self._lock:
+            board = self._instances.get(uri)
+            if board is None:
+                self.metadata(uri)
+                board = self._instances[uri] = Board(uri, **self._board_kwargs)
+            return board
+
+    def boards(self, uris=None):
+        """Yield :class:`py8chan.Board` objects, each created only as it is reached.
+
+        Args:
+            uris: Board URIs, such as the result of :meth:`top`. Defaults to every board.
+        """
+        for uri in (self if uris is None else uris):
+            yield self.board(uri)
+
+    def top(self, key, n=10, tag=None, locale=None):
+        """Returns the URIs of the ``n`` boards with the highest value of ``key``.
+
+        Args:
+            key (string): ``pph``, ``ppd``, ``active`` or ``posts_total``.
+            n (int): How many boards to return.
+            tag (string): Only boards with this tag.
+            locale (string): Only boards in this locale, such as ``en``.
+
+        Returns:
+            list of strings: Board URIs, highest first.
+        """
+        index = self._index(key)
+        allowed = self._filter(tag, locale)
+        result = []
+        for uri in reversed(index.uris):
+            if allowed is None or uri in allowed:
+                result.append(uri)
+                if len(result) >= n:
+                    break
+        return result
+
+    def between(self, key, low=None, high=None):
+        """Returns the URIs of boards with ``low <= key <= high``, lowest first.
+
+        Args:
+            key (string): ``pph``, ``ppd``, ``active`` or ``posts_total``.
+            low (float): Lower bound, or None for no lower bound.
+            high (float): Upper bound, or None for no upper bound.
+        """
+        index = self._index(key)
+        start = 0 if low is None else bisect_left(index.values, low)
+        end = len(index.values) if high is None else bisect_right(index.values, high)
+        return index.uris[start:end]
+
+    def tagged(self, tag):
+        """Returns the URIs of boards with a tag, sorted."""
+        self.refresh()
+        return sorted(self._tags.get(tag.lower(), ()))
+
+    def in_locale(self, locale):
+        """Returns the URIs of boards in a locale, such as ``en``, sorted."""
+        self.refresh()
+        return sorted(self._locales.get(locale.lower(), ()))
+
+    @property
+    def tags(self):
+        """dict: How many boards use each tag."""
+        self.refresh()
+        return dict((tag, len(uris)) for tag, uris in self._tags.items())
+
+    @property
+    def locales(self):
+        """dict: How many boards there are in each locale."""
+        self.refresh()
+        return dict((locale, len(uris)) for locale, uris in self._locales.items())
+
+    def _index(self, key):
+        self.refresh()
+        if key not in self._sorted:
+            raise ValueError('%r is not indexed, expected one of %s' % (key, ', '.join(SORTED_KEYS)))
+        return self._sorted[key]
+
+    def _filter(self, tag, locale):
+        allowed = None
+        if tag is not None:
+            allowed = self._tags.get(tag.lower(), set())
+        if locale is not None:
+            in_locale = self._locales.get(locale.lower(), set())
+            allowed = in_locale if allowed is None else allowed & in_locale
+        return allowed
+
+    def __repr__(self):
+        return '<BoardDirectory %i boards>' % len(self._boards)
@@ -0,0 +1,355 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Concurrent downloads of :class:`py8chan.File` media."""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+import requests
+
+from .client import Client, get_default_client
+
+
+class DownloadResult(object):
+    """Outcome of downloading one :class:`py8chan.File`.
+
+    Attributes:
+        file (:class:`py8chan.File`): The file that was downloaded.
+        path (string): Where it was written to.
+        ok (bool): Whether the file is now on disk, verified if requested.
+        skipped (bool): The file already existed and wasn't downloaded again.
+        bytes (int): Bytes received. Bytes of a resumed partial download received earlier aren't counted.
+        seconds (float): Time spent downloading.
+        error (Exception): What went wrong, if not ok.
+    """
+    __slots__ = ('file', 'path', 'ok', 'skipped', 'bytes', 'seconds', 'error')
+
+    def __init__(self, file, path, ok=False, skipped=False, bytes=0, seconds=0.0, error=None):
+        self.file = file
+        self.path = path
+        self.ok = ok
+        self.skipped = skipped
+        self.bytes = bytes
+        self.seconds = seconds
+        self.error = error
+
+    @property
+    def throughput(self):
+        """float: Average bytes per second, or 0 if nothing was downloaded."""
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+    def __repr__(self):
+        if self.skipped:
+            status = 'skipped'
+        elif self.ok:
+            status = '%i bytes in %.2fs' % (self.bytes, self.seconds)
+        else:
+            status = 'failed: %s' % self.error
+        return '<DownloadResult %s, %s>' % (self.path, status)
+
+
+class ChecksumError(IOError):
+    """A downloaded file doesn't match the MD5 hash reported by the API."""
+
+
+class IncompleteDownloadError(IOError):
+    """A download ended before reaching the file size reported by the API."""
+
+
+def _load_state(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (IOError, OSError, ValueError):
+        return {}
+
+
+def _save_state(path, state):
+    with open(path, 'w') as f:
+        json.dump(state, f)
+
+
+def _remove(*paths):
+    for path in paths:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def _range_start(res):
+    # Content-Range: bytes 1000-1999/2000
+    try:
+        return int(res.headers['Content-Range'].split()[1].split('-')[0])
+    except (KeyError, IndexError, ValueError):
+        return None
+
+
+class Downloader(object):
+    """Downloads many :class:`py8chan.File` objects in parallel.
+
+    Bodies are streamed to a temporary file next to their destination in
+    ``chunk_size`` pieces, hashed on the way, and only renamed into place once
+    complete and matching :attr:`py8chan.File.file_md5`, so a destination path
+    never holds a partial or corrupt file. All workers share one pooled session.
+
+    With ``resume`` set, bodies go to ``<path>.part`` instead, with a small
+    ``<path>.part.json`` sidecar recording the URL and its validators. A later
+    attempt, even from another process, asks for the rest with an HTTP Range
+    request and rehashes the bytes it already has, so large WebM and MP4 files
+    don't restart from zero after a dropped connection.
+
+    Example::
+
+        downloader = py8chan.Downloader(max_workers=8)
+        for result in downloader.iter_download(thread.file_objects(), 'images'):
+            print(result)
+
+    Attributes:
+        max_workers (int): How many files to download at once.
+        chunk_size (int): Bytes read from the network and written to disk at a time.
+        verify (bool): Check every file against its MD5 hash.
+        clobber (bool): Download files again even if they already exist.
+        timeout (float): Seconds to wait for the server, or None to wait forever.
+        resume (bool): Keep partial downloads and resume them with Range requests.
+        retries (int): How many more times to try a transfer that was cut off.
+    """
+    def __init__(self, session=None, max_workers=4, chunk_size=64 * 1024, verify=True, clobber=False,
+                 timeout=30, on_progress=None, on_complete=None, resume=False, retries=0, client=None):
+        """Creates a :class:`py8chan.Downloader` object.
+
+        Args:
+            session: Existing requests.session object to use instead of a client.
+            max_workers (int): How many files to download at once.
+            chunk_size (int): Bytes read from the network and written to disk at a time.
+            verify (bool): Check every file against its MD5 hash.
+            clobber (bool): Download files again even if they already exist.
+            timeout (float): Seconds to wait for the server, or None to wait forever.
+            on_progress (callable): Called as ``on_progress(file, received, total)``
+                after every chunk. ``total`` is None if the size isn't known.
+                Called from worker threads.
+            on_complete (callable): Called as ``on_complete(result)`` with a
+                :class:`py8chan.DownloadResult` once each file is done.
+            resume (bool): Keep partial downloads and resume them with Range requests.
+            retries (int): How many more times to try a transfer that was cut off.
+                With ``resume``, each try continues where the last one stopped.
+            client (:class:`py8chan.Client`): Client to send requests through, and
+                rate limit them with. Defaults to :func:`py8chan.get_default_client`,
+                or a copy of it with one pooled connection per worker if its pool is smaller.
+        """
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.verify = verify
+        self.clobber = clobber
+        self.timeout = timeout
+        self.on_progress = on_progress
+        self.on_complete = on_complete
+        self.resume = resume
+        self.retries = retries
+
+        if session is not None:
+            client = Client(session=session)
+        elif client is None:
+            client = get_default_client()
+            if client.pool_maxsize < max_workers:
+                # pools are sized once; leave the shared client's alone
+                client = client.copy(pool_maxsize=max_workers)
+        self._client = client
+
+    def download(self, files, directory='.', path_for=None, thumbnails=False):
+        """Download files, and return how each of them went.
+
+        Args:
+            files: Iterable of :class:`py8chan.File` objects, such as
+                :meth:`py8chan.Thread.file_objects`.
+            directory (string): Where to save files, created if needed.
+            path_for (callable): Returns the destination path of a file,
+                instead of ``directory/filename``.
+            thumbnails (bool): Download thumbnails instead of full files.
+                They aren't checked against the MD5 hash.
+
+        Returns:
+            list of :class:`py8chan.DownloadResult`: One result per file, in the order given.
+        """
+        jobs = self._jobs(files, directory, path_for, thumbnails)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(lambda job: self._download(*job), jobs))
+
+    def iter_download(self, files, directory='.', path_for=None, thumbnails=False):
+        """Download files, yielding each result as soon as it is done.
+
+        Same arguments as :meth:`download`. Stopping iteration early cancels
+        the downloads that haven't started yet.
+
+        Yields:
+            :class:`py8chan.DownloadResult`: One result per file, in completion order.
+        """
+        jobs = self._jobs(files, directory, path_for, thumbnails)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self._download, *job) for job in jobs]
+            try:
+                for future in as_completed(futures):
+                    yield future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    def _jobs(self, files, directory, path_for, thumbnails):
+        jobs = []
+        for file in files:
+            if path_for is not None:
+                path = path_for(file)
+            else:
+                path = os.path.join(directory, file.thumbnail_fname if thumbnails else file.filename)
+            jobs.append((file, path, thumbnails))
+        return jobs
+
+    def _download(self, file, path, thumbnail=False):
+        result = DownloadResult(file, path)
+        if not self.clobber and os.path.exists(path):
+            result.ok = result.skipped = True
+        else:
+            start = time.time()
+            try:
+                result.bytes = self._fetch(file, path, thumbnail)
+                result.ok = True
+            except (requests.RequestException, IOError, OSError) as e:
+                result.error = e
+            result.seconds = time.time() - start
+
+        if self.on_complete:
+            self.on_complete(result)
+        return result
+
+    def _fetch(self, file, path, thumbnail):
+        url = file.thumbnail_url if thumbnail else file.file_url
+        expected = None
+        if self.verify and not thumbnail:
+            try:
+                expected = file.file_md5
+            except KeyError:
+                pass    # no hash to check against
+        directory = os.path.dirname(path) or '.'
+        os.makedirs(directory, exist_ok=True)
+
+        fetch = self._fetch_resumable if self.resume else self._fetch_once
+        attempt = 0
+        while True:
+            try:
+                return fetch(file, url, path, None if thumbnail else file.file_size, expected)
+            except (requests.ConnectionError, requests.Timeout,
+                    requests.exceptions.ChunkedEncodingError, IncompleteDownloadError):
+                # with resume, the next attempt picks up where this one stopped
+                attempt += 1
+                if attempt > self.retries:
+                    raise
+
+    def _fetch_once(self, file, url, path, total, expected):
+        res = self._client.get(url, stream=True, timeout=self.timeout)
+        try:
+            res.raise_for_status()
+            md5 = hashlib.md5()
+
+            # written next to the destination, so the final rename stays on one filesystem
+            fd, temp_path = tempfile.mkstemp(prefix='.', suffix='.tmp', dir=os.path.dirname(path) or '.')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    received = self._write_body(file, res, f, md5, 0, total)
+                self._check(file, url, md5, received, total, expected)
+                os.replace(temp_path, path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        finally:
+            res.close()
+
+        return received
+
+    def _fetch_resumable(self, file, url, path, total, expected):
+        part_path = path + '.part'
+        state_path = part_path + '.json'
+        state = _load_state(state_path)
+
+        md5 = hashlib.md5()
+        offset = 0
+        if state.get('url') == url and os.path.exists(part_path):
+            # the digest has to cover the whole file, so rehash what we already have
+            with open(part_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(self.chunk_size), b''):
+                    md5.update(chunk)
+                    offset += len(chunk)
+            if total is not None and offset > total:
+                md5, offset = hashlib.md5(), 0
+
+        received = offset
+        if total is None or offset < total:
+            headers = {}
+            if offset:
+                headers['Range'] = 'bytes=%i-' % offset
+                # only resume if the file hasn't changed since, otherwise get all of it
+                validator = state.get('etag') or state.get('last_modified')
+                if validator:
+                    headers['If-Range'] = validator
+
+            res = self._client.get(url, headers=headers, stream=True, timeout=self.timeout)
+            try:
+                if res.status_code == 416:
+                    # our partial file is no use, start over next time
+                    _remove(part_path, state_path)
+                res.raise_for_status()
+
+                if res.status_code == 206 and _range_start(res) == offset:
+                    mode = 'ab'
+                else:
+                    md5, offset, mode = hashlib.md5(), 0, 'wb'
+
+                _save_state(state_path, {
+                    'url': url,
+                    'size': total,
+                    'etag': res.headers.get('ETag'),
+                    'last_modified': res.headers.get('Last-Modified'),
+                })
+                with open(part_path, mode) as f:
+                    received = self._write_body(file, res, f, md5, offset, total)
+            finally:
+                res.close()
+
+        try:
+            self._check(file, url, md5, received, total, expected)
+        except ChecksumError:
+            _remove(part_path, state_path)
+            raise
+        os.replace(part_path, path)
+        _remove(state_path)
+        return received - offset
+
+    def _write_body(self, file, res, f, md5, received, total):
+        for chunk in res.iter_content(chunk_size=self.chunk_size):
+            f.write(chunk)
+            md5.update(chunk)
+            received += len(chunk)
+            if self.on_progress:
+                self.on_progress(file, received, total)
+        return received
+
+    def _check(self, file, url, md5, received, total, expected):
+        if total is not None and received != total:
+            raise IncompleteDownloadError('%s: got %i of %i bytes' % (url, received, total))
+        if expected is not None and md5.digest() != expected:
+            raise ChecksumError('%s: MD5 %s does not match %s' % (
+                url, md5.hexdigest(), file.file_md5_hex))
+
+    def close(self):
+        """Release the downloader. Its client's connections stay open for others to use."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self):
+        return '<Downloader %i workers>' % self.max_workers
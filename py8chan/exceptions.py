@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Exceptions telling apart failures worth retrying from those that aren't."""
+
+
+class UpdateError(Exception):
+    """Base class of errors from fetching data from 8chan.
+
+    Attributes:
+        url (string): URL that was requested.
+        status (int): HTTP status code of the response, or None if there was none.
+        cause (Exception): Underlying exception, if any.
+    """
+    def __init__(self, message, url=None, status=None, cause=None):
+        super(UpdateError, self).__init__(message)
+        self.url = url
+        self.status = status
+        self.cause = cause
+
+
+class TransientError(UpdateError):
+    """A failure that may go away by itself: a timeout, a connection or DNS
+    error, a ``429`` or a ``5xx`` response. Try again later."""
+
+
+class PermanentError(UpdateError):
+    """A failure that retrying won't fix, such as a ``403`` response."""
+
+
+class CircuitOpenError(TransientError):
+    """Too many recent requests to this host failed, so none are sent for a while.
+
+    See :class:`py8chan.CircuitBreaker`.
+    """
+
+
+def error_for_status(status, url):
+    """Returns the error matching an unexpected HTTP status code."""
+    if status == 429 or status >= 500:
+        return TransientError('%s: HTTP %i' % (url, status), url, status)
+    return PermanentError('%s: HTTP %i' % (url, status), url, status)
@@ -0,0 +1,295 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Streaming export of posts to JSON Lines, Parquet and Arrow files.
+
+Posts are written straight from their raw API dicts, one thread at a time,
+so memory use stays bounded by a few threads rather than the board.
+Parquet and Arrow output require the optional ``pyarrow`` dependency, and
+zstd compression the optional ``zstandard`` one.
+"""
+import gzip
+import io
+import json
+
+from .board import Board
+from .thread import Thread
+
+# column name -> kind, for columnar output. Other keys are only kept in JSON Lines.
+POST_COLUMNS = (
+    ('board', 'string'), ('no', 'int'), ('resto', 'int'), ('time', 'int'), ('last_modified', 'int'),
+    ('name', 'string'), ('trip', 'string'), ('id', 'string'), ('capcode', 'string'), ('email', 'string'),
+    ('country', 'string'), ('country_name', 'string'), ('sub', 'string'), ('com', 'string'),
+    ('sticky', 'int'), ('locked', 'int'), ('cyclical', 'int'), ('bumplocked', 'int'),
+    ('replies', 'int'), ('images', 'int'), ('omitted_posts', 'int'), ('omitted_images', 'int'),
+    ('filename', 'string'), ('ext', 'string'), ('tim', 'string'), ('md5', 'string'), ('fsize', 'int'),
+    ('w', 'int'), ('h', 'int'), ('tn_w', 'int'), ('tn_h', 'int'), ('spoiler', 'int'), ('fpath', 'int'),
+    ('embed', 'string'), ('extra_files', 'json'),
+)
+
+
+def iter_threads(sources, max_workers=None):
+    """Yield threads from boards, threads, or iterables of either.
+
+    Boards are expanded thread by thread with :meth:`py8chan.Board.iter_all_threads`.
+    Threads fetched that way that weren't already in the board's cache are
+    dropped from it once the next one is requested, so walking a whole board
+    doesn't keep all of it in memory. At most ``2 * max_workers`` threads are
+    fetched ahead of the one being consumed.
+
+    Args:
+        sources: A :class:`py8chan.Board`, a :class:`py8chan.Thread`, or an iterable of them.
+        max_workers (int): How many threads of a board to fetch in parallel.
+    """
+    if isinstance(sources, (Board, Thread)):
+        sources = (sources,)
+    for source in sources:
+        if isinstance(source, Thread):
+            yield source
+        elif isinstance(source, Board):
+            cached = set(source.cache.keys())
+            for thread in source.iter_all_threads(expand=True, max_workers=max_workers):
+                yield thread
+                if thread.id not in cached:
+                    source.cache.pop(thread.id, None)
+        else:
+            for thread in iter_threads(source, max_workers):
+                yield thread
+
+
+def iter_post_records(sources, max_workers=None):
+    """Yield every post of the given boards and threads as a raw API dict.
+
+    Each dict is a shallow copy of the post's data with a ``board`` key added.
+
+    Args:
+        sources: A :class:`py8chan.Board`, a :class:`py8chan.Thread`, or an iterable of them.
+        max_workers (int): How many threads of a board to fetch in parallel.
+    """
+    for thread in iter_threads(sources, max_workers):
+        board = thread._board.name
+        for data in thread.raw_posts:
+            record = dict(data)
+            record['board'] = board
+            yield record
+
+
+def _open(path, compression):
+    if compression is None:
+        if path.endswith('.gz'):
+            compression = 'gzip'
+        elif path.endswith('.zst'):
+            compression = 'zstd'
+
+    if compression is None:
+        return io.open(path, 'w', encoding='utf-8')
+    if compression == 'gzip':
+        return gzip.open(path, 'wt', encoding='utf-8')
+    if compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError('zstd compression requires zstandard: pip install zstandard')
+        return io.TextIOWrapper(zstandard.ZstdCompressor().stream_writer(open(path, 'wb')), encoding='utf-8')
+    raise ValueError('unknown compression %r, expected gzip or zstd' % compression)
+
+
+class JSONLinesExporter(object):
+    """Writes posts to a newline-delimited JSON file, one post per line.
+
+    Example::
+
+        with py8chan.JSONLinesExporter('tech.jsonl.gz') as exporter:
+            exporter.write(py8chan.Board('tech'), max_workers=8)
+
+    Attributes:
+        path (string): File being written.
+        posts (int): How many posts have been written so far.
+    """
+    def __init__(self, path, compression=None):
+        """Creates a :class:`py8chan.JSONLinesExporter` object.
+
+        Args:
+            path (string): File to write, replaced if it exists.
+            compression (string): ``'gzip'`` or ``'zstd'``. Guessed from a ``.gz``
+                or ``.zst`` extension by default.
+        """
+        self.path = path
+        self.posts = 0
+        self._file = _open(path, compression)
+
+    def write(self, sources, max_workers=None):
+        """Write every post of the given boards and threads.
+
+        Args:
+            sources: A :class:`py8chan.Board`, a :class:`py8chan.Thread`, or an iterable of them.
+            max_workers (int): How many threads of a board to fetch in parallel.
+
+        Returns:
+            int: How many posts were written.
+        """
+        return self.write_records(iter_post_records(sources, max_workers))
+
+    def write_records(self, records):
+        """Write post dicts, such as those from :func:`iter_post_records`."""
+        write, dumps = self._file.write, json.dumps
+        count = 0
+        for record in records:
+            write(dumps(record, ensure_ascii=False, separators=(',', ':')))
+            write('\n')
+            count += 1
+        self.posts += count
+        return count
+
+    def close(self):
+        """Finish and close the file."""
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self):
+        return '<JSONLinesExporter %s, %i posts>' % (self.path, self.posts)
+
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _string(value):
+    return None if value is None else str(value)
+
+
+def _json(value):
+    return None if value is None else json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+_CONVERTERS = {'int': _int, 'string': _string, 'json': _json}
+
+
+class ParquetExporter(object):
+    """Writes posts to a Parquet file, in row groups of ``batch_size`` posts.
+
+    Only the columns in :data:`POST_COLUMNS` are kept; ``extra_files`` is
+    stored as a JSON string. At most ``batch_size`` posts are held in memory.
+    Requires the optional ``pyarrow`` dependency.
+
+    Example::
+
+        with py8chan.ParquetExporter('tech.parquet') as exporter:
+            exporter.write(py8chan.Board('tech'))
+
+    Attributes:
+        path (string): File being written.
+        batch_size (int): Posts per row group.
+        posts (int): How many posts have been written so far.
+    """
+    def __init__(self, path, batch_size=10000, compression='snappy'):
+        """Creates a :class:`py8chan.ParquetExporter` object.
+
+        Args:
+            path (string): File to write, replaced if it exists.
+            batch_size (int): Posts per row group.
+            compression (string): Parquet compression codec, such as ``'snappy'`` or ``'zstd'``.
+        """
+        pa = _import_pyarrow()
+        self.path = path
+        self.batch_size = batch_size
+        self.posts = 0
+        self._schema = pa.schema([(name, _ARROW_TYPES[kind](pa)) for name, kind in POST_COLUMNS])
+        self._buffer = []
+        self._writer = self._open_writer(pa, compression)
+
+    def _open_writer(self, pa, compression):
+        import pyarrow.parquet
+        return pyarrow.parquet.ParquetWriter(self.path, self._schema, compression=compression)
+
+    def write(self, sources, max_workers=None):
+        """Write every post of the given boards and threads.
+
+        Args:
+            sources: A :class:`py8chan.Board`, a :class:`py8chan.Thread`, or an iterable of them.
+            max_workers (int): How many threads of a board to fetch in parallel.
+
+        Returns:
+            int: How many posts were written.
+        """
+        return self.write_records(iter_post_records(sources, max_workers))
+
+    def write_records(self, records):
+        """Write post dicts, such as those from :func:`iter_post_records`."""
+        count = 0
+        for record in records:
+            self._buffer.append(record)
+            count += 1
+            if len(self._buffer) >= self.batch_size:
+                self._flush()
+        self.posts += count
+        return count
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        import pyarrow as pa
+        columns = dict(
+            (name, [_CONVERTERS[kind](record.get(name)) for record in self._buffer])
+            for name, kind in POST_COLUMNS
+        )
+        self._write_batch(pa.RecordBatch.from_pydict(columns, schema=self._schema))
+        self._buffer = []
+
+    def _write_batch(self, batch):
+        self._writer.write_batch(batch)
+
+    def close(self):
+        """Write the last row group, and close the file."""
+        self._flush()
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self):
+        return '<%s %s, %i posts>' % (type(self).__name__, self.path, self.posts)
+
+
+class ArrowExporter(ParquetExporter):
+    """Writes posts to an Arrow IPC (Feather v2) file, in record batches of ``batch_size`` posts.
+
+    Same as :class:`py8chan.ParquetExporter` otherwise. ``compression`` is
+    ``'lz4'``, ``'zstd'`` or None.
+    """
+    def __init__(self, path, batch_size=10000, compression=None):
+        super(ArrowExporter, self).__init__(path, batch_size, compression)
+
+    def _open_writer(self, pa, compression):
+        self._sink = pa.OSFile(self.path, 'wb')
+        options = pa.ipc.IpcWriteOptions(compression=compression)
+        return pa.ipc.new_file(self._sink, self._schema, options=options)
+
+    def close(self):
+        super(ArrowExporter, self).close()
+        self._sink.close()
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError('Parquet and Arrow export require pyarrow: pip install py8chan[parquet]')
+    return pyarrow
+
+
+_ARROW_TYPES = {
+    'int': lambda pa: pa.int64(),
+    'string': lambda pa: pa.string(),
+    'json': lambda pa: pa.string(),
+}
@@ -1,7 +1,6 @@
 # brand new class to handle 8chan/vichan's multiple files per post
 # supersedes py4chan's file generators in Thread and Post
 
-from .url import Url
 from base64 import b64decode
 from binascii import hexlify
 
@@ -29,11 +28,16 @@ class File(object):
         thumbnail_fname (string): Filename of the thumbnail attached to this post.
         thumbnail_url (string): URL of the thumbnail attached to this post.
     """
+    __slots__ = ('_post', '_data')
 
     def __init__(self, post, data):
         self._post = post
         self._data = data
-        self._url = Url(board=self._post._thread._board.name, https=self._post._thread._board.https)       # 8chan URL generator
+
+    # 8chan URL generator, shared with the board
+    @property
+    def _url(self):
+        return self._post._thread._url
 
     @property
     def file_md5(self):
@@ -116,11 +120,27 @@ class File(object):
             self._data['ext']
         )
 
+    # blocking requests go through the board's Client, which only Board has
+    def _client(self):
+        client = getattr(self._post._thread._board, '_client', None)
+        if client is None:
+            raise TypeError('file_request() and thumbnail_request() only work with files of a py8chan.Board; '
+                            'download files of an AsyncBoard with its aiohttp session or a py8chan.Downloader')
+        return client
+
     def file_request(self):
-        return self._post._thread._board._requests_session.get(self.file_url)
+        """Fetch the file through the board's :class:`py8chan.Client`.
+
+        Only works with files of a :class:`py8chan.Board`, not an :class:`py8chan.AsyncBoard`.
+
+        Raises:
+            TypeError: The file belongs to an :class:`py8chan.AsyncThread`.
+        """
+        return self._client().get(self.file_url)
 
     def thumbnail_request(self):
-        return self._post._thread._board._requests_session.get(self.thumbnail_url)
+        """Fetch the thumbnail through the board's :class:`py8chan.Client`, see :meth:`file_request`."""
+        return self._client().get(self.thumbnail_url)
 
     def __repr__(self):
         return '<File %s from Post /%s/%i#%i>' % (
@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Columnar, NumPy-backed view of posts for vectorized analytics.
+
+Requires the optional ``numpy`` dependency.
+"""
+from collections import Counter
+
+# column name -> NumPy dtype. Missing values are 0, or -1 for interned codes.
+FRAME_COLUMNS = (
+    ('no', 'int64'), ('resto', 'int64'), ('thread', 'int64'), ('time', 'int64'),
+    ('files', 'int16'), ('fsize', 'int64'), ('total_fsize', 'int64'),
+    ('w', 'int32'), ('h', 'int32'), ('ext', 'int16'), ('poster', 'int32'),
+)
+
+
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError('PostFrame requires numpy: pip install py8chan[frame]')
+    return numpy
+
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+class PostFrame(object):
+    """Posts as NumPy arrays, one per column, built in one pass over the raw post dicts.
+
+    No :class:`py8chan.Post` or :class:`py8chan.File` objects are created.
+    File columns describe a post's first file; ``files`` counts all of them and
+    ``total_fsize`` adds up their sizes. Extensions and poster IDs are interned:
+    ``ext`` and ``poster`` hold indexes into :attr:`extensions` and
+    :attr:`poster_ids`, or -1 where the post has none.
+
+    Example::
+
+        frame = py8chan.Board('tech').to_frame(expand=True, max_workers=8)
+        starts, counts = frame.posts_per_interval(60)
+        print(counts.max(), 'posts in the busiest minute')
+        print(frame.poster_counts().most_common(5))
+
+    Attributes:
+        board (string): Board the posts were taken from, if known.
+        no, resto, thread, time, files, fsize, total_fsize, w, h, ext, poster
+            (:class:`numpy.ndarray`): The columns, see :data:`FRAME_COLUMNS`.
+        extensions (tuple of strings): File extension of each ``ext`` code, such as ``.jpg``.
+        poster_ids (tuple of strings): Poster ID of each ``poster`` code.
+    """
+    def __init__(self, columns, extensions=(), poster_ids=(), board=None):
+        """Creates a :class:`py8chan.PostFrame` object from existing columns.
+
+        Use :meth:`from_posts`, :meth:`py8chan.Thread.to_frame` or
+        :meth:`py8chan.Board.to_frame` instead to build one from posts.
+
+        Args:
+            columns (dict): Array of every column in :data:`FRAME_COLUMNS`, all the same length.
+            extensions (tuple of strings): File extension of each ``ext`` code.
+            poster_ids (tuple of strings): Poster ID of each ``poster`` code.
+            board (string): Board the posts were taken from.
+        """
+        np = _import_numpy()
+        for name, dtype in FRAME_COLUMNS:
+            setattr(self, name, np.asarray(columns[name], dtype=dtype))
+        self.extensions = tuple(extensions)
+        self.poster_ids = tuple(poster_ids)
+        self.board = board
+
+    @classmethod
+    def from_posts(cls, posts, board=None):
+        """Build a frame from raw API post dicts, such as :attr:`py8chan.Thread.raw_posts`.
+
+        Args:
+            posts: Iterable of post dicts.
+            board (string): Board the posts were taken from.
+        """
+        columns = dict((name, []) for name, _ in FRAME_COLUMNS)
+        no, resto, thread, time_ = columns['no'], columns['resto'], columns['thread'], columns['time']
+        files, fsize, total_fsize = columns['files'], columns['fsize'], columns['total_fsize']
+        w, h, ext, poster = columns['w'], columns['h'], columns['ext'], columns['poster']
+        ext_codes, poster_codes = {}, {}
+
+        for data in posts:
+            post_no = data['no']
+            parent = data.get('resto') or 0
+            no.append(post_no)
+            resto.append(parent)
+            thread.append(parent or post_no)
+            time_.append(data.get('time') or 0)
+
+            poster_id = data.get('id')
+            poster.append(-1 if poster_id is None else poster_codes.setdefault(poster_id, len(poster_codes)))
+
+            if 'filename' in data:
+                size = _int(data.get('fsize'))
+                extra = data.get('extra_files') or ()
+                files.append(1 + len(extra))
+                fsize.append(size)
+                total_fsize.append(size + sum(_int(f.get('fsize')) for f in extra))
+                w.append(_int(data.get('w')))
+                h.append(_int(data.get('h')))
+                extension = data.get('ext')
+                ext.append(-1 if extension is None else ext_codes.setdefault(extension, len(ext_codes)))
+            else:
+                files.append(0)
+                fsize.append(0)
+                total_fsize.append(0)
+                w.append(0)
+                h.append(0)
+                ext.append(-1)
+
+        return cls(columns, _by_code(ext_codes), _by_code(poster_codes), board)
+
+    @classmethod
+    def from_threads(cls, threads, board=None):
+        """Build a frame from every post of some :class:`py8chan.Thread` objects."""
+        return cls.from_posts((data for thread in threads for data in thread.raw_posts), board)
+
+    @property
+    def columns(self):
+        """dict: Every column by name, such as for ``pandas.DataFrame(frame.columns)``."""
+        return dict((name, getattr(self, name)) for name, _ in FRAME_COLUMNS)
+
+    def __len__(self):
+        return len(self.no)
+
+    def select(self, mask):
+        """Returns a new frame with only some of the posts.
+
+        Args:
+            mask: Boolean array, or array of indexes, such as ``frame.files > 0``.
+        """
+        return PostFrame(dict((name, column[mask]) for name, column in self.columns.items()),
+                         self.extensions, self.poster_ids, self.board)
+
+    def posts_per_interval(self, seconds=60):
+        """Count posts in consecutive intervals of ``seconds``, skipping empty ones.
+
+        Returns:
+            tuple of two :class:`numpy.ndarray`: Unix timestamp each interval starts at,
+            and how many posts it has.
+        """
+        np = _import_numpy()
+        buckets, counts = np.unique(self.time // seconds, return_counts=True)
+        return buckets * seconds, counts
+
+    def posts_per_thread(self):
+        """Returns a :class:`collections.Counter` of thread number to post count."""
+        return self._count(self.thread)
+
+    def poster_counts(self):
+        """Returns a :class:`collections.Counter` of poster ID to post count.
+
+        Posts without a poster ID aren't counted.
+        """
+        return self._count_codes(self.poster, self.poster_ids)
+
+    @property
+    def unique_posters(self):
+        """int: How many different poster IDs posted."""
+        np = _import_numpy()
+        return int(np.count_nonzero(np.bincount(self.poster[self.poster >= 0], minlength=1)))
+
+    def extension_counts(self):
+        """Returns a :class:`collections.Counter` of file extension to how many posts' first file has it."""
+        return self._count_codes(self.ext, self.extensions)
+
+    def file_sizes(self, all_files=False):
+        """Returns the sizes in bytes of the files of posts that have any.
+
+        Args:
+            all_files (bool): Sum every file of each post, not just the first.
+        """
+        return (self.total_fsize if all_files else self.fsize)[self.files > 0]
+
+    def _count(self, column):
+        np = _import_numpy()
+        values, counts = np.unique(column, return_counts=True)
+        return Counter(dict(zip(values.tolist(), counts.tolist())))
+
+    def _count_codes(self, codes, names):
+        np = _import_numpy()
+        counts = np.bincount(codes[codes >= 0], minlength=len(names))
+        return Counter(dict((name, count) for name, count in zip(names, counts.tolist()) if count))
+
+    def __repr__(self):
+        return '<PostFrame %s%i posts>' % ('/%s/, ' % self.board if self.board else '', len(self))
+
+
+def _by_code(codes):
+    names = [None] * len(codes)
+    for name, code in codes.items():
+        names[code] = name
+    return names
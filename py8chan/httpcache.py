@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Persistent on-disk cache for API responses."""
+import json
+import sqlite3
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# response headers worth keeping alongside the body
+_KEPT_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Date')
+
+# cache hits whose access time is kept in memory before being written out together
+_ACCESS_BATCH = 64
+
+
+class HTTPCache(object):
+    """SQLite store of API response bodies and their validators.
+
+    Mount it on a board with ``py8chan.Board('tech', http_cache=HTTPCache('cache.db'))``.
+    Cached responses are revalidated with ``If-None-Match``/``If-Modified-Since``,
+    and a ``304 Not Modified`` reply is answered with the body from disk.
+    Reads don't write to the database: the access times used for eviction are
+    written out in batches, alongside the next stored response.
+
+    Attributes:
+        path (string): Path of the SQLite database.
+        max_bytes (int): Most bytes of response bodies to keep, or None for no limit.
+            Least recently used responses are evicted first.
+        offline (bool): Never touch the network. ``GET`` and ``HEAD`` requests are
+            answered from disk, and every request that can't be raises
+            :class:`requests.ConnectionError`.
+    """
+    def __init__(self, path, max_bytes=None, offline=False):
+        """Creates a :class:`py8chan.HTTPCache` object.
+
+        Args:
+            path (string): Path of the SQLite database, created if needed.
+            max_bytes (int): Most bytes of response bodies to keep.
+            offline (bool): Answer every request from disk.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.offline = offline
+
+        self._lock = threading.Lock()
+        self._accessed = {}     # url -> access time not yet written
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        # write-ahead logging only syncs at checkpoints, not on every commit
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            ' url TEXT PRIMARY KEY, body BLOB, headers TEXT,'
+            ' size INTEGER, stored REAL, accessed REAL)'
+        )
+        self._db.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)')
+        self._db.commit()
+        self._bytes = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    def get(self, url):
+        """Returns ``(body, headers)`` for a cached URL, or None."""
+        with self._lock:
+            row = self._db.execute('SELECT body, headers FROM responses WHERE url = ?', (url,)).fetchone()
+            if row is None:
+                return None
+            self._accessed[url] = time.time()
+            if len(self._accessed) >= _ACCESS_BATCH:
+                self._flush_accessed()
+                self._db.commit()
+        return bytes(row[0]), json.loads(row[1])
+
+    def set(self, url, body, headers):
+        """Stores the body and headers of a response."""
+        headers = dict((key, headers[key]) for key in _KEPT_HEADERS if key in headers)
+        now = time.time()
+        with self._lock:
+            old = self._db.execute('SELECT size FROM responses WHERE url = ?', (url,)).fetchone()
+            if old is not None:
+                self._bytes -= old[0]
+            self._db.execute(
+                'INSERT OR REPLACE INTO responses (url, body, headers, size, stored, accessed)'
+                ' VALUES (?, ?, ?, ?, ?, ?)',
+                (url, sqlite3.Binary(body), json.dumps(headers), len(body), now, now)
+            )
+            self._bytes += len(body)
+            self._accessed.pop(url, None)
+            self._flush_accessed()
+            self._evict()
+            self._db.commit()
+
+    def delete(self, url):
+        """Removes a URL from the cache."""
+        with self._lock:
+            row = self._db.execute('SELECT size FROM responses WHERE url = ?', (url,)).fetchone()
+            if row is not None:
+                self._db.execute('DELETE FROM responses WHERE url = ?', (url,))
+                self._bytes -= row[0]
+                self._db.commit()
+            self._accessed.pop(url, None)
+
+    def clear(self):
+        """Removes everything from the cache."""
+        with self._lock:
+            self._db.execute('DELETE FROM responses')
+            self._db.commit()
+            self._accessed.clear()
+            self._bytes = 0
+
+    def close(self):
+        """Closes the database."""
+        with self._lock:
+            self._flush_accessed()
+            self._db.commit()
+            self._db.close()
+
+    @property
+    def size(self):
+        """int: Bytes of response bodies currently stored."""
+        return self._bytes
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+    def _flush_accessed(self):
+        if self._accessed:
+            self._db.executemany('UPDATE responses SET accessed = ? WHERE url = ?',
+                                 [(accessed, url) for url, accessed in self._accessed.items()])
+            self._accessed.clear()
+
+    def _evict(self):
+        if self.max_bytes is None:
+            return
+        while self._bytes > self.max_bytes:
+            row = self._db.execute(
+                'SELECT url, size FROM responses ORDER BY accessed LIMIT 1'
+            ).fetchone()
+            if row is None:
+                break
+            self._db.execute('DELETE FROM responses WHERE url = ?', (row[0],))
+            self._bytes -= row[1]
+
+    def __repr__(self):
+        return '<HTTPCache %s, %i bytes>' % (self.path, self._bytes)
+
+
+class CachingAdapter(HTTPAdapter):
+    """Transport adapter answering GET requests through an :class:`HTTPCache`.
+
+    Requests that already carry their own ``If-None-Match`` or
+    ``If-Modified-Since`` header, such as :meth:`py8chan.Thread.update`, get the
+    server's ``304`` passed through untouched, so they can still tell that
+    nothing has changed.
+    """
+    def __init__(self, cache, **kwargs):
+        self.cache = cache
+        super(CachingAdapter, self).__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if self.cache.offline:
+            # HEAD is answered from the cached GET, without its body
+            cached = self.cache.get(request.url) if request.method in ('GET', 'HEAD') else None
+            if cached is None:
+                raise requests.ConnectionError('%s %s is not cached, and the cache is offline'
+                                               % (request.method, request.url), request=request)
+            body, headers = cached
+            return self._cached_response(request, body if request.method == 'GET' else b'', headers)
+
+        if request.method != 'GET':
+            return super(CachingAdapter, self).send(request, **kwargs)
+
+        conditional = 'If-None-Match' in request.headers or 'If-Modified-Since' in request.headers
+        cached = self.cache.get(request.url)
+
+        if cached is not None and not conditional:
+            headers = cached[1]
+            if 'ETag' in headers:
+                request.headers['If-None-Match'] = headers['ETag']
+            if 'Last-Modified' in headers:
+                request.headers['If-Modified-Since'] = headers['Last-Modified']
+
+        res = super(CachingAdapter, self).send(request, **kwargs)
+
+        if res.status_code == 304 and cached is not None and not conditional:
+            res.close()
+            return self._cached_response(request, *cached)
+
+        if res.status_code == 200:
+            self.cache.set(request.url, res.content, res.headers)
+
+        return res
+
+    def _cached_response(self, request, body, headers):
+        res = requests.Response()
+        res.status_code = 200
+        res.reason = 'OK'
+        res.headers = CaseInsensitiveDict(headers)
+        res.encoding = get_encoding_from_headers(res.headers)
+        res._content = body
+        res._content_consumed = True
+        res.url = request.url
+        res.request = request
+        res.connection = self
+        res.from_cache = True
+        return res
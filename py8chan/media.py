@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Deduplicated, content-addressed store of downloaded media."""
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+
+from .download import Downloader, DownloadResult
+
+# new-style vichan tims are the SHA-256 of the file
+_SHA256_RE = re.compile(r'^[0-9a-f]{64}$')
+
+
+def _sha256_of(file):
+    tim = str(file._data.get('tim', ''))
+    return tim if _SHA256_RE.match(tim) else None
+
+
+class MediaStore(object):
+    """Keeps a single copy of every file, however often it is reposted.
+
+    Files are stored once as blobs named after their MD5 hash under
+    ``root/blobs``, and indexed by MD5 and, for new-style ``tim`` values, by
+    SHA-256 in a SQLite database. :meth:`save` looks every file up in that
+    index before touching the network: known files are hard linked (or copied,
+    where links aren't possible) into chan.arc-style thread directories,
+    ``root/<board>/<thread>/images/<filename>``, without making any request.
+
+    Example::
+
+        store = py8chan.MediaStore('8chan')
+        for thread in board.get_all_threads(expand=True):
+            store.save(thread.file_objects())
+
+    Attributes:
+        root (string): Directory holding the blobs, the index and the thread directories.
+        downloader (:class:`py8chan.Downloader`): Used to fetch files that aren't stored yet.
+    """
+    def __init__(self, root, downloader=None, index_path=None):
+        """Creates a :class:`py8chan.MediaStore` object.
+
+        Args:
+            root (string): Directory holding the blobs, the index and the thread directories.
+            downloader (:class:`py8chan.Downloader`): Used to fetch new files.
+                Defaults to a Downloader with MD5 verification.
+            index_path (string): Path of the SQLite index. Defaults to ``root/media.db``.
+        """
+        self.root = root
+        self.downloader = downloader or Downloader()
+        os.makedirs(root, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(index_path or os.path.join(root, 'media.db'), check_same_thread=False)
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS media ('
+            ' md5 TEXT PRIMARY KEY, sha256 TEXT, path TEXT, size INTEGER, added REAL)'
+        )
+        self._db.execute('CREATE INDEX IF NOT EXISTS media_sha256 ON media (sha256)')
+        self._db.commit()
+
+    def lookup(self, file):
+        """Returns the blob path of a stored file, or None if we don't have it."""
+        sha256 = _sha256_of(file)
+        with self._lock:
+            row = self._db.execute('SELECT path FROM media WHERE md5 = ?', (file.file_md5_hex,)).fetchone()
+            if row is None and sha256 is not None:
+                row = self._db.execute('SELECT path FROM media WHERE sha256 = ?', (sha256,)).fetchone()
+        if row is None:
+            return None
+        path = os.path.join(self.root, row[0])
+        return path if os.path.exists(path) else None
+
+    def __contains__(self, file):
+        return self.lookup(file) is not None
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM media').fetchone()[0]
+
+    def blob_path(self, file):
+        """Returns where the blob of a file is, or would be, stored."""
+        md5 = file.file_md5_hex
+        return os.path.join(self.root, 'blobs', md5[:2], md5 + (file.file_extension or ''))
+
+    def thread_path(self, file):
+        """Returns the chan.arc-style path a file is linked to, ``root/<board>/<thread>/images/<filename>``."""
+        thread = file._post._thread
+        return os.path.join(self.root, thread._board.name, str(thread.id), 'images', file.filename)
+
+    def add(self, file, path):
+        """Index an already downloaded copy of a file, moving it into the store.
+
+        Args:
+            file (:class:`py8chan.File`): The file ``path`` holds.
+            path (string): Where it was downloaded to. It is verified by the caller.
+
+        Returns:
+            string: Path of the blob.
+        """
+        blob = self.blob_path(file)
+        if os.path.abspath(path) != os.path.abspath(blob):
+            directory = os.path.dirname(blob)
+            os.makedirs(directory, exist_ok=True)
+            os.replace(path, blob)
+        self._index(file, blob)
+        return blob
+
+    def save(self, files, path_for=None):
+        """Store files and link them into their thread directories.
+
+        Files already in the store, or repeated within ``files``, are only
+        downloaded once. Known files are linked without any request.
+
+        Args:
+            files: Iterable of :class:`py8chan.File` objects, such as
+                :meth:`py8chan.Thread.file_objects`.
+            path_for (callable): Returns where to link a file, instead of :meth:`thread_path`.
+
+        Returns:
+            list of :class:`py8chan.DownloadResult`: One result per file, in the
+            order given. ``path`` is the linked path, and ``skipped`` is set for
+            files that were already stored.
+        """
+        path_for = path_for or self.thread_path
+        files = list(files)
+
+        # one download per unique file we don't already have
+        blobs, missing = {}, {}
+        for file in files:
+            md5 = file.file_md5_hex
+            if md5 in blobs or md5 in missing:
+                continue
+            blob = self.lookup(file)
+            if blob is not None:
+                blobs[md5] = blob
+            else:
+                missing[md5] = file
+
+        errors = {}
+        for result in self.downloader.download(missing.values(), path_for=self.blob_path):
+            md5 = result.file.file_md5_hex
+            if result.ok:
+                self._index(result.file, result.path)
+                blobs[md5] = result.path
+            else:
+                errors[md5] = result
+
+        results = []
+        for file in files:
+            md5 = file.file_md5_hex
+            path = path_for(file)
+            if md5 in errors:
+                failed = errors[md5]
+                results.append(DownloadResult(file, path, error=failed.error, seconds=failed.seconds))
+                continue
+            try:
+                self._link(blobs[md5], path)
+            except OSError as e:
+                results.append(DownloadResult(file, path, error=e))
+                continue
+            fetched = missing.pop(md5, None) is file
+            results.append(DownloadResult(file, path, ok=True, skipped=not fetched,
+                                          bytes=os.path.getsize(blobs[md5]) if fetched else 0))
+        return results
+
+    def remove(self, file):
+        """Forget a file and delete its blob. Links to it are left alone."""
+        blob = self.lookup(file)
+        with self._lock:
+            self._db.execute('DELETE FROM media WHERE md5 = ?', (file.file_md5_hex,))
+            self._db.commit()
+        if blob is not None:
+            os.unlink(blob)
+
+    def close(self):
+        """Closes the index."""
+        with self._lock:
+            self._db.close()
+
+    def _index(self, file, blob):
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO media (md5, sha256, path, size, added) VALUES (?, ?, ?, ?, ?)',
+                (file.file_md5_hex, _sha256_of(file), os.path.relpath(blob, self.root),
+                 os.path.getsize(blob), time.time())
+            )
+            self._db.commit()
+
+    def _link(self, blob, path):
+        if os.path.exists(path):
+            return
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        try:
+            os.link(blob, path)
+        except OSError:
+            # different filesystem, or links aren't supported
+            shutil.copyfile(blob, path)
+
+    def __repr__(self):
+        return '<MediaStore %s, %i files>' % (self.root, len(self))
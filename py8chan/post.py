@@ -3,7 +3,6 @@
 from datetime import datetime
 import re
 
-from .url import Url
 from .util import clean_comment_body
 from .file import File
 
@@ -35,16 +34,24 @@ class Post(object):
         has_file (bool): Whether this post has a file attached to it.
         has_extra_files (bool): Whether this post has more than one file attached to it.
         url (string): URL of this post.
+        quotes (tuple of int): Posts of this thread this post quotes, see :attr:`py8chan.Thread.reply_graph`.
+        backlinks (tuple of int): Posts of this thread quoting this post.
     """
+    __slots__ = ('_thread', '_data', 'file1', '_text_comment')
+
     def __init__(self, thread, data):
         self._thread = thread
         self._data = data
-        self._url = Url(board=self._thread._board.name, https=thread.https)        # 4chan URL generator
 
         # add file objects if they exist
         if self.has_file:
             self.file1 = File(self, self._data)
 
+    # 8chan URL generator, shared with the board
+    @property
+    def _url(self):
+        return self._thread._url
+
     @property
     def is_op(self):
         return self == self._thread.topic
@@ -71,9 +78,22 @@ class Post(object):
     def comment(self):
         return self.html_comment.replace('<wbr>', '')
 
+    # converted once, the post's data doesn't change
     @property
     def text_comment(self):
-        return clean_comment_body(self.html_comment)
+        try:
+            return self._text_comment
+        except AttributeError:
+            self._text_comment = clean_comment_body(self.html_comment)
+            return self._text_comment
+
+    @property
+    def quotes(self):
+        return self._thread.reply_graph.quotes(self.post_id)
+
+    @property
+    def backlinks(self):
+        return self._thread.reply_graph.backlinks(self.post_id)
 
     @property
     def name(self):
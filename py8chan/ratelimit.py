@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Per-host request pacing that backs off when the server pushes back."""
+import asyncio
+from email.utils import parsedate_to_datetime
+import threading
+import time
+
+try:
+    from urllib.parse import urlsplit
+except ImportError:
+    from urlparse import urlsplit
+
+# responses telling us to slow down
+THROTTLE_STATUSES = (429, 503)
+
+
+def retry_after(headers):
+    """Returns the seconds a ``Retry-After`` header asks us to wait, or None."""
+    value = headers.get('Retry-After') if headers is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+class TokenBucket(object):
+    """Token bucket pacing requests to one host.
+
+    Tokens refill at ``rate`` per second, up to ``burst``. Every request takes
+    one, waiting for it if none is left. Waits are reserved up front, so
+    concurrent callers queue up fairly instead of all waking at once. Nothing
+    refills while a ``Retry-After`` pause lasts, so requests held back by it
+    go out one by one afterwards, at the reduced rate.
+
+    The rate adapts additively-increase, multiplicatively-decrease: every
+    throttled response cuts it by ``decrease``, down to ``min_rate``, and every
+    successful one raises it by ``increase``, back up to ``max_rate``.
+
+    Attributes:
+        rate (float): Current requests per second.
+        max_rate (float): Requests per second we never exceed.
+        burst (float): Most requests sent back to back after idling.
+    """
+    def __init__(self, rate, burst=1, min_rate=0.05, increase=0.05, decrease=0.5):
+        self.rate = self.max_rate = float(rate)
+        self.burst = float(burst)
+        self.min_rate = min_rate
+        self.increase = increase
+        self.decrease = decrease
+
+        self._tokens = self.burst
+        self._clock = time.monotonic
+        self._updated = self._clock()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Take a token, and return how many seconds to wait before using it."""
+        with self._lock:
+            now = self._clock()
+            # nothing refills while blocked, so _updated may lie in the future
+            if now > self._updated:
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+            self._tokens -= 1
+            wait = self._updated - now
+            if self._tokens < 0:
+                wait += -self._tokens / self.rate
+            return wait
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Wait, without blocking the event loop, until a request may be sent."""
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def throttled(self, delay=None):
+        """Slow down after a ``429`` or ``503``, and pause for ``delay`` seconds if given."""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            now = self._clock()
+            self._blocked_until = max(self._blocked_until, now + (delay if delay is not None else 1.0 / self.rate))
+            # requests queue up after the pause, one every 1 / rate seconds,
+            # rather than all going out the moment it ends
+            self._tokens = min(self._tokens, 0.0)
+            self._updated = max(self._updated, self._blocked_until)
+
+    def succeeded(self):
+        """Speed back up after a request went through."""
+        if self.rate < self.max_rate:
+            with self._lock:
+                self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def __repr__(self):
+        return '<TokenBucket %.2f/%.2f requests per second>' % (self.rate, self.max_rate)
+
+
+class RateLimiter(object):
+    """Paces requests with a separate :class:`TokenBucket` for every host.
+
+    The API host and the media host are throttled separately by 8chan, so
+    each host gets its own budget: ``rate`` and ``burst`` by default, or the
+    values given for it in ``hosts``. It can be shared by every board, and by
+    threads and coroutines alike.
+
+    Example::
+
+        limiter = py8chan.RateLimiter(rate=1, burst=3, hosts={'media.128ducks.com': (5, 10)})
+        py8chan.set_default_client(py8chan.Client(rate_limiter=limiter))
+
+    Attributes:
+        rate (float): Requests per second to each host without its own budget.
+        burst (float): Requests sent back to back to each host without its own budget.
+    """
+    def __init__(self, rate=1.0, burst=1, hosts=None, min_rate=0.05, increase=0.05, decrease=0.5):
+        """Creates a :class:`py8chan.RateLimiter` object.
+
+        Args:
+            rate (float): Requests per second to each host.
+            burst (float): Requests sent back to back to each host after idling.
+            hosts (dict): ``(rate, burst)`` for particular hosts, such as
+                ``{'8kun.top': (1, 2), 'media.128ducks.com': (5, 10)}``.
+            min_rate (float): Lowest requests per second to back off to.
+            increase (float): Requests per second added back after each successful request.
+            decrease (float): Factor the rate is multiplied by after each throttled request.
+        """
+        self.rate = rate
+        self.burst = burst
+        self._bucket_kwargs = dict(min_rate=min_rate, increase=increase, decrease=decrease)
+        self._hosts = {}
+        for host, (host_rate, host_burst) in (hosts or {}).items():
+            self._hosts[self._host(host) if '://' in host else host] = (host_rate, host_burst)
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _host(url):
+        return urlsplit(url).netloc
+
+    def bucket(self, url):
+        """Returns the :class:`TokenBucket` of the host a URL points to."""
+        host = self._host(url)
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(host)
+                if bucket is None:
+                    rate, burst = self._hosts.get(host, (self.rate, self.burst))
+                    bucket = self._buckets[host] = TokenBucket(rate, burst, **self._bucket_kwargs)
+        return bucket
+
+    def acquire(self, url):
+        """Block until a request to this URL may be sent."""
+        self.bucket(url).acquire()
+
+    async def acquire_async(self, url):
+        """Wait, without blocking the event loop, until a request to this URL may be sent."""
+        await self.bucket(url).acquire_async()
+
+    def observe(self, url, status, headers=None):
+        """Adapt the host's rate to a response.
+
+        Args:
+            url (string): URL the request was sent to.
+            status (int): Response status code.
+            headers: Response headers, checked for ``Retry-After``.
+
+        Returns:
+            bool: Whether the response asked us to slow down.
+        """
+        bucket = self.bucket(url)
+        if status in THROTTLE_STATUSES:
+            bucket.throttled(retry_after(headers))
+            return True
+        if status < 500:
+            bucket.succeeded()
+        return False
+
+    def __repr__(self):
+        return '<RateLimiter %s>' % ', '.join('%s %.2f/s' % (host, bucket.rate)
+                                             for host, bucket in sorted(self._buckets.items()))
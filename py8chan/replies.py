@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Reply graph of the ``>>12345`` quotelinks between posts."""
+import re
+
+# quotelink targets, as vichan renders them: href="/tech/res/12345.html#12350"
+_QUOTELINK_RE = re.compile(r'<a [^>]*?href="(?:https?://[^/"]+)?/([^/"]+)/res/(\d+)\.html#q?(\d+)"')
+
+
+class QuoteLink(tuple):
+    """A post linked to by a quotelink, as a ``(board, thread, post)`` tuple."""
+    __slots__ = ()
+
+    def __new__(cls, board, thread, post):
+        return tuple.__new__(cls, (board, thread, post))
+
+    board = property(lambda self: self[0])
+    thread = property(lambda self: self[1])
+    post = property(lambda self: self[2])
+
+    def __repr__(self):
+        return '<QuoteLink /%s/%i#%i>' % self
+
+
+def parse_quotelinks(comment):
+    """Returns the posts a comment's HTML links to, in order and without repeats.
+
+    Args:
+        comment (string): HTML comment of a post, as in ``com``.
+
+    Returns:
+        list of :class:`py8chan.replies.QuoteLink`
+    """
+    if not comment or 'res/' not in comment:
+        return []
+    links = []
+    for board, thread, post in _QUOTELINK_RE.findall(comment):
+        link = QuoteLink(board, int(thread), int(post))
+        if link not in links:
+            links.append(link)
+    return links
+
+
+class ReplyGraph(object):
+    """Which posts quote which, and which posts quote them back.
+
+    Every post is parsed once, when it is added; posts added again with an
+    unchanged comment are skipped, so a growing thread can be fed its new
+    replies without reparsing the old ones. Lookups are dict lookups.
+
+    By default the graph covers a single thread, and posts are identified by
+    their number. Links to posts in other threads or on other boards are
+    kept apart, and returned by :meth:`external_quotes`. With
+    ``cross_thread=True`` it can hold any number of threads from any boards
+    instead, posts are identified by ``(board, post)`` tuples (or by
+    :class:`py8chan.replies.QuoteLink`), and every link is followed.
+
+    Example::
+
+        thread = board.get_thread(12345)
+        graph = thread.reply_graph
+        for no in graph.backlinks(thread.topic.post_id):
+            print(no, 'replied to the OP')
+
+    Attributes:
+        board (string): Board of the thread, for a single-thread graph.
+        thread (int): Number of the thread, for a single-thread graph.
+        cross_thread (bool): Whether posts of many threads are linked together.
+    """
+    def __init__(self, board=None, thread=None, cross_thread=False):
+        """Creates a :class:`py8chan.ReplyGraph` object.
+
+        Args:
+            board (string): Board of the thread, needed to tell links out of it apart.
+            thread (int): Number of the thread.
+            cross_thread (bool): Follow links across threads and boards.
+        """
+        self.board = board
+        self.thread = thread
+        self.cross_thread = cross_thread
+
+        self._comments = {}     # post -> comment it was parsed from
+        self._quotes = {}       # post -> posts it quotes
+        self._external = {}     # post -> QuoteLinks out of the thread, single-thread only
+        self._backlinks = {}    # post -> posts quoting it
+
+    def _key(self, post):
+        if not self.cross_thread:
+            return post
+        if len(post) == 3:
+            return (post[0], post[2])
+        return tuple(post)
+
+    def add_posts(self, posts, board=None, thread=None):
+        """Parse the quotelinks of posts that are new, or whose comment changed.
+
+        Args:
+            posts: Raw API post dicts, such as :attr:`py8chan.Thread.raw_posts`.
+            board (string): Board of the posts. Defaults to :attr:`board`.
+            thread (int): Thread of the posts. Defaults to :attr:`thread`.
+
+        Returns:
+            int: How many posts were parsed.
+        """
+        board = board or self.board
+        thread = thread or self.thread
+        parsed = 0
+        for data in posts:
+            no = data['no']
+            key = (board, no) if self.cross_thread else no
+            comment = data.get('com', '')
+            previous = self._comments.get(key)
+            if previous is not None and previous == comment:
+                continue
+            if previous is not None:
+                self._unlink(key)
+            self._comments[key] = comment
+            self._link(key, parse_quotelinks(comment), board, thread or data.get('resto') or no)
+            parsed += 1
+        return parsed
+
+    def add_thread(self, thread):
+        """Add the posts of a :class:`py8chan.Thread`, see :meth:`add_posts`."""
+        return self.add_posts(thread.raw_posts, thread._board.name, thread.id)
+
+    def _link(self, key, links, board, thread):
+        quotes, external = [], []
+        for link in links:
+            if self.cross_thread:
+                quotes.append(link)
+                target = (link.board, link.post)
+                source = QuoteLink(board, thread, key[1])
+            elif link.board == board and link.thread == thread:
+                quotes.append(link.post)
+                target, source = link.post, key
+            else:
+                external.append(link)
+                continue
+            self._backlinks.setdefault(target, []).append(source)
+        if quotes:
+            self._quotes[key] = tuple(quotes)
+        if external:
+            self._external[key] = tuple(external)
+
+    def _unlink(self, key):
+        for link in self._quotes.pop(key, ()):
+            target = (link.board, link.post) if self.cross_thread else link
+            backlinks = self._backlinks.get(target)
+            if backlinks is None:
+                continue
+            backlinks[:] = [source for source in backlinks if self._key(source) != key]
+            if not backlinks:
+                del self._backlinks[target]
+        self._external.pop(key, None)
+
+    def discard(self, post):
+        """Forget a post's own quotelinks, such as after it was deleted.
+
+        Backlinks to it from posts still in the graph are kept.
+        """
+        key = self._key(post)
+        if self._comments.pop(key, None) is not None:
+            self._unlink(key)
+
+    def retain(self, posts):
+        """Discard every post not in ``posts``, an iterable of post identifiers."""
+        keep = set(self._key(post) for post in posts)
+        for key in [key for key in self._comments if key not in keep]:
+            self.discard(key)
+
+    def quotes(self, post):
+        """Returns the posts a post quotes, in the order they appear in its comment.
+
+        Args:
+            post: Post number, or ``(board, post)`` in a cross-thread graph.
+
+        Returns:
+            tuple: Post numbers, or :class:`py8chan.replies.QuoteLink` in a cross-thread graph.
+        """
+        return self._quotes.get(self._key(post), ())
+
+    def backlinks(self, post):
+        """Returns the posts quoting a post, in the order they were added.
+
+        Args:
+            post: Post number, or ``(board, post)`` in a cross-thread graph.
+
+        Returns:
+            tuple: Post numbers, or :class:`py8chan.replies.QuoteLink` in a cross-thread graph.
+        """
+        return tuple(self._backlinks.get(self._key(post), ()))
+
+    def external_quotes(self, post):
+        """Returns the posts in other threads or on other boards a post links to.
+
+        Always empty in a cross-thread graph, where :meth:`quotes` has them.
+
+        Returns:
+            tuple of :class:`py8chan.replies.QuoteLink`
+        """
+        return self._external.get(self._key(post), ())
+
+    def edges(self):
+        """Yield every ``(post, quoted post)`` pair in the graph, external links excepted."""
+        for key, quotes in self._quotes.items():
+            for quoted in quotes:
+                yield key, quoted
+
+    def __contains__(self, post):
+        return self._key(post) in self._comments
+
+    def __len__(self):
+        return len(self._comments)
+
+    def __repr__(self):
+        if self.cross_thread:
+            return '<ReplyGraph %i posts>' % len(self)
+        return '<ReplyGraph /%s/%s, %i posts>' % (self.board, self.thread, len(self))
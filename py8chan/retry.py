@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Retry policies and per-host circuit breaking."""
+import random
+import threading
+import time
+
+try:
+    from urllib.parse import urlsplit
+except ImportError:
+    from urlparse import urlsplit
+
+from .exceptions import CircuitOpenError
+
+
+class RetryPolicy(object):
+    """How often, and how patiently, to retry transient failures.
+
+    Waits grow exponentially and are drawn at random from ``[0, delay]``
+    ("full jitter"), so many clients failing at once don't all come back at
+    the same moment.
+
+    Attributes:
+        retries (int): How many times to retry. 0 fails straight away.
+        backoff (float): Longest wait before the first retry, in seconds.
+        max_backoff (float): Longest wait before any retry, in seconds.
+        jitter (bool): Wait a random part of the delay, rather than all of it.
+    """
+    def __init__(self, retries=0, backoff=0.5, max_backoff=30.0, jitter=True):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+
+    def delay(self, attempt):
+        """Returns how many seconds to wait before retry number ``attempt``, from 0."""
+        delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+        return random.uniform(0, delay) if self.jitter else delay
+
+    def __repr__(self):
+        return '<RetryPolicy %i retries, backoff %.2fs>' % (self.retries, self.backoff)
+
+
+class _HostState(object):
+    __slots__ = ('failures', 'opened_at')
+
+    def __init__(self):
+        self.failures = 0
+        self.opened_at = None
+
+
+class CircuitBreaker(object):
+    """Stops sending requests to a host that keeps failing.
+
+    After ``failure_threshold`` consecutive failures, the host's circuit opens
+    and requests to it fail straight away with
+    :class:`py8chan.exceptions.CircuitOpenError`. After ``reset_timeout``
+    seconds a single trial request is let through: if it succeeds, the circuit
+    closes again, otherwise it stays open for another ``reset_timeout``.
+
+    Attributes:
+        failure_threshold (int): Consecutive failures that open a host's circuit.
+        reset_timeout (float): Seconds before a trial request is let through.
+    """
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._hosts = {}
+        self._lock = threading.Lock()
+        self._clock = time.monotonic
+
+    def _state(self, url):
+        host = urlsplit(url).netloc
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState()
+        return state
+
+    def allow(self, url):
+        """Raise :class:`py8chan.exceptions.CircuitOpenError` unless a request to this URL may be sent."""
+        with self._lock:
+            state = self._state(url)
+            if state.opened_at is None:
+                return
+            if self._clock() - state.opened_at < self.reset_timeout:
+                raise CircuitOpenError('%s is failing, not sending requests to it for now'
+                                       % urlsplit(url).netloc, url)
+            # let one trial request through, and hold the others back until it's done
+            state.opened_at = self._clock()
+
+    def record_success(self, url):
+        """Close the host's circuit."""
+        with self._lock:
+            state = self._state(url)
+            state.failures = 0
+            state.opened_at = None
+
+    def record_failure(self, url):
+        """Count a failure, opening the host's circuit once there are too many."""
+        with self._lock:
+            state = self._state(url)
+            state.failures += 1
+            if state.failures >= self.failure_threshold:
+                state.opened_at = self._clock()
+
+    def is_open(self, url):
+        """Whether requests to this URL's host are being held back."""
+        with self._lock:
+            state = self._state(url)
+            return state.opened_at is not None and self._clock() - state.opened_at < self.reset_timeout
+
+    def __repr__(self):
+        return '<CircuitBreaker %i open>' % sum(
+            state.opened_at is not None for state in self._hosts.values())
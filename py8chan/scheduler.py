@@ -0,0 +1,243 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Adaptive polling of watched threads."""
+import heapq
+import itertools
+import time
+
+from .exceptions import PermanentError
+
+
+class _WatchState(object):
+    __slots__ = ('interval', 'velocity', 'last_poll', 'entry')
+
+    def __init__(self, interval, velocity, last_poll):
+        self.interval = interval
+        self.velocity = velocity    # estimated posts per second
+        self.last_poll = last_poll  # when we last knew the thread's posts, starting from its last post
+        self.entry = None           # current heap entry, stale entries are skipped
+
+
+class ThreadScheduler(object):
+    """Polls watched :class:`py8chan.Thread` objects, each at its own pace.
+
+    Watched threads are kept in a priority queue ordered by when they are next
+    due. After each :meth:`py8chan.Thread.update`, a thread's next poll is set
+    from its observed post velocity: busy threads are polled often, while
+    threads that keep returning no new posts back off exponentially up to
+    ``max_interval``. Failed polls back off the same way, from the interval
+    the thread already had. Velocity is measured from the last post we
+    already had, so the first poll after :meth:`watch` counts the time before
+    it too, and polls too close together to measure a rate keep the current
+    velocity. Locked threads, which can't receive new posts, are polled at
+    ``max_interval``; bumplocked threads, which will soon fall off the board,
+    are polled at least every ``min_interval * backoff`` seconds.
+    Requests across all threads never exceed ``requests_per_second``.
+
+    Example::
+
+        scheduler = py8chan.ThreadScheduler(
+            on_new_posts=lambda thread, count: print(thread, count, 'new posts'),
+            on_404=lambda thread: print(thread, 'died'),
+        )
+        scheduler.watch(board.get_thread(12345))
+        scheduler.run()
+
+    Attributes:
+        min_interval (float): Shortest delay between two polls of the same thread, in seconds.
+        max_interval (float): Longest delay between two polls of the same thread, in seconds.
+        backoff (float): Factor the delay is multiplied by when a poll finds nothing new.
+        posts_per_poll (float): How many new posts we aim to pick up with each poll.
+        requests_per_second (float): Global cap on polls, across all watched threads.
+        max_failures (int): Unwatch a thread after this many consecutive failed updates, or None.
+    """
+    def __init__(self, min_interval=10, max_interval=600, backoff=2.0, posts_per_poll=5,
+                 requests_per_second=1.0, on_new_posts=None, on_404=None, on_error=None, max_failures=None):
+        """Creates a :class:`py8chan.ThreadScheduler` object.
+
+        Args:
+            min_interval (float): Shortest delay between two polls of the same thread, in seconds.
+            max_interval (float): Longest delay between two polls of the same thread, in seconds.
+            backoff (float): Factor the delay is multiplied by when a poll finds nothing new.
+            posts_per_poll (float): How many new posts we aim to pick up with each poll.
+            requests_per_second (float): Global cap on polls, across all watched threads.
+            on_new_posts (callable): Called as ``on_new_posts(thread, count)`` when an update found new posts.
+            on_404 (callable): Called as ``on_404(thread)`` once a thread has 404'd. It is then unwatched.
+            on_error (callable): Called as ``on_error(thread, exception)`` when an update failed.
+                Threads failing with a :class:`py8chan.exceptions.PermanentError` are unwatched.
+            max_failures (int): Unwatch a thread after this many consecutive failed updates.
+        """
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.posts_per_poll = posts_per_poll
+        self.requests_per_second = requests_per_second
+        self.on_new_posts = on_new_posts
+        self.on_404 = on_404
+        self.on_error = on_error
+        self.max_failures = max_failures
+
+        self._queue = []
+        self._states = {}
+        self._counter = itertools.count()
+        self._last_request = None
+        self._clock = time.monotonic
+        self._time = time.time
+        self._sleep = time.sleep
+
+    def watch(self, thread, delay=None):
+        """Start polling a thread.
+
+        Args:
+            thread (:class:`py8chan.Thread`): Thread to watch.
+            delay (float): Seconds until the first poll. Defaults to the
+                interval estimated from the thread's existing posts.
+        """
+        velocity = self._initial_velocity(thread)
+        state = _WatchState(self._interval_for(thread, velocity), velocity, self._last_known(thread))
+        self._states[thread] = state
+        self._schedule(thread, state, state.interval if delay is None else delay)
+
+    def unwatch(self, thread):
+        """Stop polling a thread."""
+        self._states.pop(thread, None)
+
+    def __contains__(self, thread):
+        return thread in self._states
+
+    def __len__(self):
+        return len(self._states)
+
+    @property
+    def threads(self):
+        """list of :class:`py8chan.Thread`: Every watched thread."""
+        return list(self._states)
+
+    def next_poll_in(self):
+        """Seconds until the next thread is due, or None if nothing is watched."""
+        entry = self._peek()
+        if entry is None:
+            return None
+        return max(0.0, entry[0] - self._clock())
+
+    def poll(self):
+        """Wait for the next due thread, and update it.
+
+        Returns:
+            tuple: ``(thread, new_posts)`` for the thread that was polled,
+            or None if nothing is watched.
+        """
+        entry = self._peek()
+        if entry is None:
+            return None
+
+        due, _, thread = heapq.heappop(self._queue)
+        state = self._states[thread]
+
+        wait = max(due - self._clock(), self._rate_limit_wait())
+        if wait > 0:
+            self._sleep(wait)
+
+        self._last_request = now = self._clock()
+        elapsed = now - state.last_poll
+
+        try:
+            new_posts = thread.update(raise_errors=True)
+        except Exception as e:
+            new_posts = 0
+            failures = max(1, getattr(thread, 'consecutive_failures', 1))
+            if isinstance(e, PermanentError) or (self.max_failures and failures >= self.max_failures):
+                self.unwatch(thread)
+            else:
+                # back off from the interval the thread already had, never shorten it
+                state.interval = self._clamp(thread, state.interval * self.backoff)
+            if self.on_error:
+                self.on_error(thread, e)
+        else:
+            if thread.is_404:
+                self.unwatch(thread)
+                if self.on_404:
+                    self.on_404(thread)
+                return thread, 0
+
+            state.last_poll = now
+            self._observe(thread, state, new_posts, elapsed)
+            if new_posts and self.on_new_posts:
+                self.on_new_posts(thread, new_posts)
+
+        if self._states.get(thread) is state:
+            self._schedule(thread, state, state.interval)
+        return thread, new_posts
+
+    def run(self, until=None):
+        """Poll watched threads until none are left.
+
+        Args:
+            until (callable): Optional function returning True when polling should stop.
+        """
+        while self._states and not (until and until()):
+            self.poll()
+
+    def _schedule(self, thread, state, delay):
+        state.entry = (self._clock() + delay, next(self._counter), thread)
+        heapq.heappush(self._queue, state.entry)
+
+    def _peek(self):
+        # drop entries of unwatched or rescheduled threads
+        while self._queue:
+            entry = self._queue[0]
+            state = self._states.get(entry[2])
+            if state is not None and state.entry is entry:
+                return entry
+            heapq.heappop(self._queue)
+        return None
+
+    def _rate_limit_wait(self):
+        if self._last_request is None or not self.requests_per_second:
+            return 0.0
+        return self._last_request + 1.0 / self.requests_per_second - self._clock()
+
+    def _initial_velocity(self, thread):
+        # posts per second over the most recent replies we already have
+        times = [post['time'] for post in thread.raw_posts[-10:] if post.get('time')]
+        if len(times) < 2 or times[-1] <= times[0]:
+            return 0.0
+        return (len(times) - 1) / float(times[-1] - times[0])
+
+    def _last_known(self, thread):
+        # the thread's posts are known up to its last post, which can be well
+        # before watch(); post times are Unix time, our clock is monotonic
+        times = [post['time'] for post in thread.raw_posts[-1:] if post.get('time')]
+        if not times:
+            return self._clock()
+        return self._clock() - max(0.0, self._time() - times[0])
+
+    def _observe(self, thread, state, new_posts, elapsed):
+        if new_posts:
+            if elapsed >= max(self.min_interval, 1.0):
+                # exponentially weighted moving average of posts per second
+                state.velocity = 0.5 * state.velocity + 0.5 * new_posts / elapsed
+                interval = self._interval_for(thread, state.velocity)
+            else:
+                # too soon to measure a rate, but new posts never lengthen the interval
+                interval = min(state.interval, self._interval_for(thread, state.velocity))
+        else:
+            state.velocity *= 0.5
+            interval = self._clamp(thread, state.interval * self.backoff)
+        state.interval = interval
+
+    def _interval_for(self, thread, velocity):
+        if velocity > 0:
+            return self._clamp(thread, self.posts_per_poll / velocity)
+        return self._clamp(thread, self.max_interval)
+
+    def _clamp(self, thread, interval):
+        topic = thread.topic
+        if topic is not None and topic.locked:
+            return self.max_interval
+
+        interval = min(self.max_interval, max(self.min_interval, interval))
+
+        if topic is not None and topic.bumplocked:
+            interval = min(interval, self.min_interval * self.backoff)
+        return interval
@@ -1,7 +1,148 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
+try:
+    from collections.abc import MutableSequence, Sequence
+except ImportError:
+    from collections import MutableSequence, Sequence
+import time
+
+import requests
+
+from .frame import PostFrame
+from .exceptions import PermanentError, TransientError, error_for_status
 from .post import Post
-from .url import Url
+from .replies import ReplyGraph
+from .util import clean_comment_bodies
+
+# failures of the connection or the transfer, worth trying again later
+_TRANSFER_ERRORS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError,
+                    requests.exceptions.ContentDecodingError, requests.exceptions.RetryError)
+
+
+class _ListCompat(object):
+    # lets post sequences be compared and concatenated like the lists they replace
+    __slots__ = ()
+
+    def __eq__(self, other):
+        if isinstance(other, (Sequence, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        return list(other) + list(self)
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class _PostList(_ListCompat, MutableSequence):
+    """List of a thread's replies, backed by the raw post dicts.
+
+    :class:`py8chan.Post` objects are only created when a reply is first
+    accessed, and are kept from then on.
+    """
+    __slots__ = ('_thread', '_raw', '_posts')
+
+    def __init__(self, thread):
+        self._thread = thread
+        self._raw = []
+        self._posts = []    # Post objects, or None where not materialized yet
+
+    @property
+    def raw(self):
+        """list of dict: The post dicts, as returned by the API. Do not modify."""
+        return self._raw
+
+    def _post(self, index):
+        post = self._posts[index]
+        if post is None:
+            post = self._posts[index] = Post(self._thread, self._raw[index])
+        return post
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._post(i) for i in range(*index.indices(len(self._raw)))]
+        return self._post(index)
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            value = [self._unpack(v) for v in value]
+            self._raw[index] = [raw for raw, _ in value]
+            self._posts[index] = [post for _, post in value]
+        else:
+            self._raw[index], self._posts[index] = self._unpack(value)
+
+    def __delitem__(self, index):
+        del self._raw[index]
+        del self._posts[index]
+
+    def __len__(self):
+        return len(self._raw)
+
+    def __iter__(self):
+        for i in range(len(self._raw)):
+            yield self._post(i)
+
+    def insert(self, index, value):
+        raw, post = self._unpack(value)
+        self._raw.insert(index, raw)
+        self._posts.insert(index, post)
+
+    def _unpack(self, value):
+        # accept Post objects as well as raw post dicts
+        if isinstance(value, Post):
+            return value._data, value
+        return value, None
+
+    def _extend_raw(self, posts):
+        for raw in posts:
+            self._raw.append(raw)
+            self._posts.append(None)
+
+    def _replace_raw(self, posts):
+        # keep Post objects whose data hasn't changed, by post number
+        materialized = dict((post._data['no'], post) for post in self._posts if post is not None)
+        self._raw = list(posts)
+        self._posts = [None] * len(self._raw)
+        if materialized:
+            for i, raw in enumerate(self._raw):
+                post = materialized.get(raw['no'])
+                if post is not None and post._data == raw:
+                    self._posts[i] = post
+
+
+class _PostsView(_ListCompat, Sequence):
+    """Read-only sequence of every post in a thread, the OP first."""
+    __slots__ = ('_thread',)
+
+    def __init__(self, thread):
+        self._thread = thread
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index == 0:
+            return self._thread.topic
+        if index < 0:
+            raise IndexError('post index out of range')
+        return self._thread.replies[index - 1]
+
+    def __len__(self):
+        return len(self._thread.replies) + 1
+
+    def __iter__(self):
+        yield self._thread.topic
+        for post in self._thread.replies:
+            yield post
 
 
 class Thread(object):
@@ -11,9 +152,15 @@ class Thread(object):
         closed (bool): Whether the thread has been closed.
         sticky (bool): Whether this thread is a 'sticky'.
         topic (:class:`py8chan.Post`): Topic post of the thread, the OP.
+        replies (list of :class:`py8chan.Post`): List of all replies in the thread. Post objects
+            are created from the raw post dicts on first access.
         posts (list of :class:`py8chan.Post`): List of all posts in the thread, including the OP.
+        raw_posts (list of dict): Post dicts of all posts in the thread, as returned by the API.
         all_posts (list of :class:`py8chan.Post`): List of all posts in the thread, including the OP and any omitted posts.
         url (string): URL of the thread, not including semantic slug.
+        last_error (:class:`py8chan.exceptions.UpdateError`): Why the last :meth:`update` failed, or None if it didn't.
+        consecutive_failures (int): Failed updates since the last one that went through.
+        total_failures (int): Failed updates over the lifetime of this object.
         
 	Undefined Attributes (Not implemented in 8chan API. Do not use.):
         replies and images: Infuriatingly, the OP post in a thread
@@ -21,21 +168,39 @@ class Thread(object):
         semantic_url (string): URL of this post, with the thread's 'semantic' component.
         semantic_slug (string): This post's 'semantic slug'.
     """
+    __slots__ = ('_board', '_url', 'id', 'topic', 'replies', 'is_404', 'last_reply_id',
+                 'omitted_posts', 'omitted_images', 'want_update', 'num_replies', 'num_images',
+                 'last_error', 'consecutive_failures', 'total_failures', '_reply_graph', '__weakref__')
+
     def __init__(self, board, id):
         self._board = board
-        self._url = Url(board=board.name, https=board.https)       # 8chan URL generator
-        self.id = self.number = self.num = self.no = id
+        self._url = board._url       # 8chan URL generator, shared with the board
+        self.id = id
         self.topic = None
-        self.replies = []
+        self.replies = _PostList(self)
         self.is_404 = False
         self.last_reply_id = 0
         self.omitted_posts = 0
         self.omitted_images = 0
         self.want_update = False
+        self.last_error = None
+        self.consecutive_failures = 0
+        self.total_failures = 0
+        self._reply_graph = None     # built on first use, then kept up to date by updates
 
     def __len__(self):
         return self.num_replies
 
+    # allows id to exist as multiple different names
+    @property
+    def number(self):
+        return self.id
+    num = no = number
+
+    @property
+    def op(self):
+        return self.topic
+
     @property
     def _api_url(self):
         return self._url.thread_api_url(self.id)
@@ -60,7 +225,7 @@ class Thread(object):
 
         res.raise_for_status()
 
-        return cls._from_json(res.json(), board, id)
+        return cls._from_json(board._json_decoder(res.content), board, id)
 
     @classmethod
     def _from_json(cls, json, board, id=None):
@@ -69,8 +234,8 @@ class Thread(object):
         posts = json['posts']
         head, rest = posts[0], posts[1:]
 
-        t.topic = t.op = Post(t, head)
-        t.replies.extend(Post(t, p) for p in rest)
+        t.topic = Post(t, head)
+        t.replies._extend_raw(rest)
 
         t.id = head.get('no', id)
         t.num_replies = len(posts) - 1	# There's no "replies" item in OP on 8ch!
@@ -79,106 +244,109 @@ class Thread(object):
         t.omitted_posts = head.get('omitted_posts', 0)
 
         if id is not None:
-            if not t.replies:
+            if not rest:
                 t.last_reply_id = t.topic.post_id
             else:
-                t.last_reply_id = t.replies[-1].post_id
+                t.last_reply_id = rest[-1]['no']
 
         else:
             t.want_update = True
 
         return t
 
+    def _posts_with_files(self):
+        # only materialize the replies that actually have files
+        if self.topic.has_file:
+            yield self.topic
+
+        for i, raw in enumerate(self.replies.raw):
+            if 'filename' in raw:
+                yield self.replies[i]
+
     def files(self):
         """Returns the URLs of all files attached to posts in the thread."""
-        # yield all from the topic
-        if self.topic.has_file:
-            for item in self.topic.all_files():
+        for post in self._posts_with_files():
+            for item in post.all_files():
                 yield item.file_url
 
-        # yield all from other posts
-        for reply in self.replies:
-            if reply.has_file:
-                for item in reply.all_files():
-                    yield item.file_url
-
     def thumbs(self):
         """Returns the URLs of all thumbnails in the thread."""
-        # yield all from the topic
-        if self.topic.has_file:
-            for item in self.topic.all_files():
+        for post in self._posts_with_files():
+            for item in post.all_files():
                 yield item.thumbnail_url
 
-        # yield all from other posts
-        for reply in self.replies:
-            if reply.has_file:
-                for item in reply.all_files():
-                    yield item.thumbnail_url
-
     def filenames(self):
         """Returns the filenames of all files attached to posts in the thread."""
-        # yield all from the topic
-        if self.topic.has_file:
-            for item in self.topic.all_files():
+        for post in self._posts_with_files():
+            for item in post.all_files():
                 yield item.filename
 
-        # yield all from other posts
-        for reply in self.replies:
-            if reply.has_file:
-                for item in reply.all_files():
-                    yield item.filename
-
     def thumbnames(self):
         """Returns the filenames of all thumbnails in the thread."""
-        # yield all from the topic
-        if self.topic.has_file:
-            for item in self.topic.all_files():
+        for post in self._posts_with_files():
+            for item in post.all_files():
                 yield item.thumbnail_fname
 
-        # yield all from other posts
-        for reply in self.replies:
-            if reply.has_file:
-                for item in reply.all_files():
-                    yield item.thumbnail_fname
-
     def file_objects(self):
         """Returns the :class:`py8chan.File` objects of all files attached to posts in the thread."""
-        # yield all from the topic
-        if self.topic.has_file:
-            for item in self.topic.all_files():
+        for post in self._posts_with_files():
+            for item in post.all_files():
                 yield item
 
-        # yield all from other posts
-        for reply in self.replies:
-            if reply.has_file:
-                for item in reply.all_files():
-                    yield item
+    def text_comments(self):
+        """Returns the plaintext comments of all posts in the thread, the OP first.
+
+        Converts the raw post data directly, without building any :class:`py8chan.Post`.
+        """
+        return clean_comment_bodies(post.get('com', '') for post in self.raw_posts)
 
-    def update(self, force=False):
+    def update(self, force=False, raise_errors=False):
         """Fetch new posts from the server.
 
+        Transient failures are retried according to the board's
+        :class:`py8chan.RetryPolicy`. A failed update returns 0 and is recorded
+        in :attr:`last_error`, :attr:`consecutive_failures` and :attr:`total_failures`.
+
         Arguments:
             force (bool): Force a thread update, even if thread has 404'd.
+            raise_errors (bool): Raise the error of a failed update instead of returning 0.
 
         Returns:
             int: How many new posts have been fetched.
+
+        Raises:
+            :class:`py8chan.exceptions.TransientError`: With ``raise_errors``, for timeouts,
+                connection errors, ``429`` and ``5xx`` responses. Try again later.
+            :class:`py8chan.exceptions.PermanentError`: With ``raise_errors``, for
+                responses retrying won't fix.
         """
 
         # The thread has already 404'ed, this function shouldn't do anything anymore.
         if self.is_404 and not force:
             return 0
 
-        if self._last_modified:
-            headers = {'If-Modified-Since': self._last_modified}
-        else:
-            headers = None
-
-        # random connection errors, just return 0 and try again later
+        policy = self._board._retry_policy
+        attempt = 0
+        while True:
+            try:
+                new_posts = self._fetch_update(force)
+            except TransientError as e:
+                if attempt < policy.retries:
+                    time.sleep(policy.delay(attempt))
+                    attempt += 1
+                    continue
+                return self._failed(e, raise_errors)
+            except PermanentError as e:
+                return self._failed(e, raise_errors)
+            self._succeeded()
+            return new_posts
+
+    def _fetch_update(self, force):
+        url = self._api_url
         try:
-            res = self._board._requests_session.get(self._api_url, headers=headers)
-        except:
-            # try again later
-            return 0
+            res = self._board._client.get(url, headers=self._update_headers())
+        except _TRANSFER_ERRORS as e:
+            raise TransientError('%s: %s' % (url, e), url, cause=e)
 
         # 304 Not Modified, no new posts.
         if res.status_code == 304:
@@ -186,43 +354,86 @@ class Thread(object):
 
         # 404 Not Found, thread died.
         elif res.status_code == 404:
-            self.is_404 = True
-            # remove post from cache, because it's gone.
-            self._board._thread_cache.pop(self.id, None)
+            self._mark_404()
             return 0
 
         elif res.status_code == 200:
-            # If we somehow 404'ed, we should put ourself back in the cache.
-            if self.is_404:
-                self.is_404 = False
-                self._board._thread_cache[self.id] = self
+            try:
+                posts = self._board._json_decoder(res.content)['posts']
+            except ValueError as e:
+                # cut off mid-transfer, or caught mid-write by the server
+                raise TransientError('%s: invalid JSON: %s' % (url, e), url, 200, e)
+            return self._merge_posts(posts, force)
 
-            # Remove
-            self.want_update = False
-            self.omitted_images = 0
-            self.omitted_posts = 0
+        else:
+            raise error_for_status(res.status_code, url)
 
-            posts = res.json()['posts']
+    def _succeeded(self):
+        self.last_error = None
+        self.consecutive_failures = 0
 
-            original_post_count = len(self.replies)
-            self.topic = Post(self, posts[0])
+    def _failed(self, error, raise_errors):
+        self.last_error = error
+        self.consecutive_failures += 1
+        self.total_failures += 1
+        if raise_errors:
+            raise error
+        return 0
 
-            if self.last_reply_id and not force:
-                self.replies.extend(Post(self, p) for p in posts if p['no'] > self.last_reply_id)
-            else:
-                self.replies[:] = [Post(self, p) for p in posts[1:]]
+    def _update_headers(self):
+        if self._last_modified:
+            return {'If-Modified-Since': self._last_modified}
+        return None
 
-            new_post_count = len(self.replies)
-            post_count_delta = new_post_count - original_post_count
-            if not post_count_delta:
-                return 0
+    def _mark_404(self):
+        self.is_404 = True
+        # remove post from cache, because it's gone.
+        self._board._thread_cache.pop(self.id, None)
 
-            self.last_reply_id = self.replies[-1].post_id
+    def _merge_posts(self, posts, force=False):
+        """Merge freshly fetched post dicts into this thread.
 
-            return post_count_delta
+        Shared by every transport that can fetch thread JSON.
 
+        Returns:
+            int: How many new posts have been added.
+        """
+        # If we somehow 404'ed, we should put ourself back in the cache.
+        if self.is_404:
+            self.is_404 = False
+            self._board._thread_cache[self.id] = self
+
+        # Remove
+        self.want_update = False
+        self.omitted_images = 0
+        self.omitted_posts = 0
+
+        original_post_count = len(self.replies)
+        self.topic = Post(self, posts[0])
+
+        graph = self._reply_graph
+        if self.last_reply_id and not force:
+            new_posts = [p for p in posts if p['no'] > self.last_reply_id]
+            self.replies._extend_raw(new_posts)
+            if graph is not None:
+                graph.add_posts([posts[0]] + new_posts)
         else:
-            res.raise_for_status()
+            self.replies._replace_raw(posts[1:])
+            if graph is not None:
+                graph.add_posts(posts)
+                graph.retain(p['no'] for p in posts)
+
+        # the cache re-estimates the thread's size here rather than on every lookup
+        self._board._thread_cache.resize(self)
+
+        new_post_count = len(self.replies)
+        post_count_delta = new_post_count - original_post_count
+        if not post_count_delta:
+            return 0
+
+        self.last_reply_id = self.replies.raw[-1]['no']
+
+        return post_count_delta
 
     def expand(self):
         """If there are omitted posts, update to include all posts."""
@@ -231,13 +442,38 @@ class Thread(object):
 
     @property
     def posts(self):
-        return [self.topic] + self.replies
+        return _PostsView(self)
+
+    @property
+    def raw_posts(self):
+        """list of dict: Every post of the thread as returned by the API, the OP first."""
+        return [self.topic._data] + self.replies.raw
 
     @property
     def all_posts(self):
         self.expand()
         return self.posts
 
+    @property
+    def reply_graph(self):
+        """:class:`py8chan.ReplyGraph`: Quotelinks between the posts of this thread.
+
+        Built from every post on first access, then fed only the new replies
+        on each update.
+        """
+        if self._reply_graph is None:
+            graph = ReplyGraph(self._board.name, self.id)
+            graph.add_posts(self.raw_posts)
+            self._reply_graph = graph
+        return self._reply_graph
+
+    def to_frame(self):
+        """Returns the posts of this thread as a :class:`py8chan.PostFrame`.
+
+        Requires the optional ``numpy`` dependency.
+        """
+        return PostFrame.from_posts(self.raw_posts, self._board.name)
+
     @property
     def https(self):
         return self._board._https
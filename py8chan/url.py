@@ -2,7 +2,14 @@
 # -*- coding: utf-8 -*-
 
 # 8chan URL generator. Inherit and override this for derivative classes  (e.g. 420chan API, 8chan/vichan API)
+#
+# One generator is built per board, and shared by reference with every Thread,
+# Post and File of that board. The site-wide URL dictionaries are built once per
+# class and protocol, and shared by every board's generator. Treat both as read-only.
 class Url(object):
+    # (class, protocol, site, media) -> site-wide URL dictionary
+    _site_urls_cache = {}
+
     # default value for board in case user wants to query board list
     def __init__(self, board, https=True):
         self._board = board
@@ -10,6 +17,26 @@ class Url(object):
         self._site_url = "8kun.top"
         self._media_url = "128ducks.com"
 
+        key = (type(self), self._protocol, self._site_url, self._media_url)
+        self.URL = self._site_urls_cache.get(key)
+        if self.URL is None:
+            self.URL = self._site_urls_cache[key] = self._build_urls()
+
+        # precomputed template parts, so per-post URLs are plain concatenations
+        # that still follow templates overridden by subclasses
+        self._thread_api_affixes = self._affixes(self.URL['api']['thread'], '{thread_id}')
+        self._thread_affixes = self._affixes(self.URL['http']['thread'], '{thread_id}')
+        self._file_affixes = self._affixes(self.URL['data']['file'], '{tim}')
+        self._thumb_affixes = self._affixes(self.URL['data']['thumbs'], '{tim}')
+        self._old_file_affixes = self._affixes(self.URL['data']['old_file'], '{tim}')
+        self._old_thumb_affixes = self._affixes(self.URL['data']['old_thumbs'], '{tim}')
+
+    def _affixes(self, template, field):
+        # the template before and after the given field, with the board filled in
+        prefix, _, suffix = template.replace('{board}', '' if self._board is None else str(self._board)).partition(field)
+        return prefix, suffix
+
+    def _build_urls(self):
         # Examples
         # Site - http://8kun.top/
         # Board (HTML) - http://8kun.top/newspaper/
@@ -62,10 +89,11 @@ class Url(object):
             'catalog': DOMAIN['api'] + '/{board}/catalog.json'
         }
 
-        # combine all dictionaries into self.URL dictionary
-        self.URL = TEMPLATE
-        self.URL.update({'domain': DOMAIN})
-        self.URL.update({'listing': LISTING})
+        # combine all dictionaries into the URL dictionary
+        URL = TEMPLATE
+        URL.update({'domain': DOMAIN})
+        URL.update({'listing': LISTING})
+        return URL
 
     # generate boards listing URL
     def board_list(self):
@@ -98,32 +126,22 @@ class Url(object):
 
     # generate API thread URL
     def thread_api_url(self, thread_id):
-        return self.URL['api']['thread'].format(
-            board=self._board,
-            thread_id=thread_id
-            )
+        prefix, suffix = self._thread_api_affixes
+        return '%s%s%s' % (prefix, thread_id, suffix)
 
     # generate HTTP thread URL
     def thread_url(self, thread_id):
-        return self.URL['http']['thread'].format(
-            board=self._board,
-            thread_id=thread_id
-            )
+        prefix, suffix = self._thread_affixes
+        return '%s%s%s' % (prefix, thread_id, suffix)
 
     # generate file URL
     def file_url(self, tim, ext):
         # new or old file URL
         if len(tim) == 64:
-            return self.URL['data']['file'].format(
-                tim=tim,
-                ext=ext
-                )
+            prefix, suffix = self._file_affixes
         else:
-            return self.URL['data']['old_file'].format(
-                board=self._board,
-                tim=tim,
-                ext=ext
-                )
+            prefix, suffix = self._old_file_affixes
+        return prefix + tim + suffix.replace('{ext}', ext)
 
     # generate thumb URL
     def thumb_url(self, tim, ext):
@@ -134,15 +152,11 @@ class Url(object):
             if ext == '.png':
                 thumb_ext = '.png'
 
-            return self.URL['data']['thumbs'].format(
-                tim=tim,
-                ext=thumb_ext
-                )
+            prefix, suffix = self._thumb_affixes
+            return prefix + tim + suffix.replace('{ext}', thumb_ext)
         else:
-            return self.URL['data']['old_thumbs'].format(
-                board=self._board,
-                tim=tim
-                )
+            prefix, suffix = self._old_thumb_affixes
+            return prefix + tim + suffix.replace('{ext}', '.jpg')
 
     # return entire URL dictionary
     @property
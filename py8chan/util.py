@@ -13,6 +13,16 @@ except ImportError:
 
 _parser = HTMLParser()
 
+# compiled once, rather than looked up on every call
+_LINK_RE = re.compile(r'<a [^>]+>(.+?)</a>')
+# same matches as r'<.+?>', without backtracking one character at a time
+_TAG_RE = re.compile(r'<(?:>[^>\n]*|[^>\n]+)>')
+_BODY_LINE = '<p class="body-line ltr ">'
+
+
+def _link_text(match):
+    return match.group(1)
+
 
 def clean_comment_body(body):
     """Returns given comment HTML as plaintext.
@@ -21,9 +31,20 @@ def clean_comment_body(body):
     into human-readable text equivalents.
     """
     body = html.unescape(body)
-    body = re.sub(r'<a [^>]+>(.+?)</a>', r'\1', body)
+    if '<a ' in body:
+        body = _LINK_RE.sub(_link_text, body)
     body = body.replace('<br>', '\n')
-    body = body.replace('<p class="body-line ltr ">', '\n')
-    body = re.sub(r'<.+?>', '', body)
+    body = body.replace(_BODY_LINE, '\n')
+    if '<' in body:
+        body = _TAG_RE.sub('', body)
     body = body.strip()
     return body
+
+
+def clean_comment_bodies(bodies):
+    """Returns a list of plaintext comments for an iterable of comment HTML.
+
+    Same as calling :func:`clean_comment_body` on each of them.
+    """
+    clean = clean_comment_body
+    return [clean(body) for body in bodies]
@@ -29,7 +29,14 @@ setup(
         'py8chan': 'py8chan',
     },
     package_data={'': ['README.rst', 'LICENSE']},
-    install_requires=['requests >= 1.0.0'],
+    install_requires=['requests >= 2.25', 'urllib3 >= 1.26'],
+    extras_require={
+        'async': ['aiohttp >= 3.0'],
+        'fast-json': ['orjson'],
+        'frame': ['numpy'],
+        'parquet': ['pyarrow'],
+        'zstd': ['zstandard'],
+    },
     keywords='8chan api vichan',
     classifiers=[
         'Intended Audience :: Developers',